@@ -1,58 +1,324 @@
 import os
 import sys
 import logging
-import random
 import json
 import time
 import subprocess
 import math
+import heapq
+from collections import OrderedDict
 from aqt import mw, gui_hooks
+from aqt.operations import QueryOp
 from aqt.qt import QMenu, QDialog, QVBoxLayout, QLabel, QLineEdit, QPushButton, QCheckBox, QMessageBox, QAction
-from PyQt6.QtCore import QTimer, Qt, QPointF
-from PyQt6.QtGui import QIcon, QPainter, QPixmap, QColor, QFont, QBrush, QPen, QPainterPath
-from PyQt6.QtSvg import QSvgRenderer
-from PyQt6.QtWidgets import QSystemTrayIcon, QWidget, QVBoxLayout, QFileDialog, QListWidget, QListWidgetItem, QScrollArea, QComboBox, QHBoxLayout, QGridLayout, QFrame, QTextEdit
+from PyQt6.QtCore import QTimer, Qt
+from PyQt6.QtGui import QIcon
+from PyQt6.QtNetwork import QLocalSocket
+from PyQt6.QtWidgets import QSystemTrayIcon, QVBoxLayout, QFileDialog, QComboBox, QHBoxLayout, QGridLayout, QFrame, QTextEdit, QListView, QAbstractItemView, QProgressDialog
+from .bulk_io import BulkTransfer
+from .content_list import PairListModel, PairItemDelegate
+from .glyph_cache import GlyphCache
+from .image_resolver import ImageResolver
+from .image_store import ImageStore
+from .pair_store import PairStore
+from .state_store import IPC_SERVER_NAME, read_json, write_json
+from .thumbnails import ThumbnailService
 
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 ADDON_PATH = os.path.dirname(__file__)
 CONFIG_PATH = os.path.join(ADDON_PATH, "star_config.json")
+CARD_COUNT_PATH = os.path.join(ADDON_PATH, "card_count.json")
+THUMBNAILS_DIR = os.path.join(ADDON_PATH, "thumbnails")
+GLYPHS_DIR = os.path.join(ADDON_PATH, "glyphs")
+IMAGES_DIR = os.path.join(ADDON_PATH, "imagens")
+PAIRS_DB_PATH = os.path.join(ADDON_PATH, "pairs.db")
+MAX_WAKEUP_SECONDS = 3600
 
 class MessageImagePair:
-    def __init__(self, message="", image_path=""):
+    def __init__(self, message="", image_path="", pair_id=None):
         self.message = message
         self.image_path = image_path
+        self.pair_id = pair_id
+
+class DeckCountService:
+    NEW, LEARN, REVIEW = 0, 1, 2
+
+    def __init__(self):
+        self.counts = {}
+        # Future intraday learning cards per (deck, home deck) bucket, as heaps of (due - collapse, card id).
+        self.learning = {}
+        self.learning_cards = {}
+        self.valid = False
+        self.today = None
+        self.day_cutoff = None
+        self.collapse_time = 1200
+        self.next_learn_due = None
+        self.deck_names = None
+        self.deck_ids = {}
+        self.shown_card = None
+        self.epoch = 0
+        self.full_counts = 0
+        self.incremental_updates = 0
+
+    def invalidate(self, *args):
+        self.valid = False
+        self.epoch += 1
+
+    def invalidate_decks(self, *args):
+        self.deck_names = None
+        self.deck_ids = {}
+        self.invalidate()
+
+    def get_deck_names(self, col):
+        if self.deck_names is None:
+            self.deck_names = sorted((deck.name, deck.id) for deck in col.decks.all_names_and_ids())
+        return self.deck_names
+
+    def selected_ids(self, col, deck_name):
+        if deck_name == "all":
+            return None
+        if deck_name not in self.deck_ids:
+            did = dict(self.get_deck_names(col)).get(deck_name)
+            self.deck_ids[deck_name] = set(col.decks.deck_and_child_ids(did)) if did else set()
+        return self.deck_ids[deck_name]
+
+    def needs_recount(self):
+        # Only the day cutoff needs a fresh scan; learning cards coming due are moved in memory.
+        return not self.valid or (self.day_cutoff is not None and time.time() >= self.day_cutoff)
+
+    @staticmethod
+    def query(col):
+        # Runs on the collection worker thread, so it only reads the collection and returns the
+        # rows; apply() swaps them in on the main thread, where the reviewer hooks also run.
+        collapse_time = col.get_config("collapseTime", 1200)
+        today = col.sched.today
+        learn_cutoff = int(time.time()) + collapse_time
+        # One grouped pass gives new/learn/review counts per (deck, home deck) pair, so a card
+        # in a filtered deck counts toward both.
+        rows = col.db.all(
+            "select did, odid, sum(type = 0), "
+            "sum((queue in (1, 4) and due <= ?) or (queue = 3 and due <= ?)), sum(queue = 2 and due <= ?) "
+            "from cards where queue not in (-2, -3) group by did, odid",
+            learn_cutoff, today, today)
+        learning = col.db.all("select did, odid, id, due from cards where queue in (1, 4) and due > ?", learn_cutoff)
+        return today, col.sched.day_cutoff, collapse_time, rows, learning
+
+    def apply(self, result, epoch):
+        # An answer or invalidate() since the query started may or may not be in its rows.
+        if epoch != self.epoch:
+            return False
+        self.today, self.day_cutoff, self.collapse_time, rows, learning = result
+        self.counts = {(did, odid): [new or 0, learn or 0, review or 0] for did, odid, new, learn, review in rows}
+        self.learning = {}
+        self.learning_cards = {}
+        for did, odid, card_id, due in learning:
+            self.learning.setdefault((did, odid), []).append((due - self.collapse_time, card_id))
+            self.learning_cards[card_id] = due - self.collapse_time
+        for heap in self.learning.values():
+            heapq.heapify(heap)
+        self.promote_learning()
+        self.valid = True
+        # The card on screen may have been answered before the rows were read; recount after it.
+        self.shown_card = None
+        self.full_counts += 1
+        return True
+
+    def next_change_time(self):
+        # The counts can only change on their own at the day cutoff or when a learning card comes due.
+        times = [t for t in (self.day_cutoff, self.next_learn_due) if t is not None]
+        return min(times) if times else None
+
+    def schedule_learning(self, bucket, card_id, learn_due):
+        self.learning_cards[card_id] = learn_due
+        heapq.heappush(self.learning.setdefault(bucket, []), (learn_due, card_id))
+        if self.next_learn_due is None or learn_due < self.next_learn_due:
+            self.next_learn_due = learn_due
+
+    def promote_learning(self, now=None):
+        # Move learning cards that came due into LEARN. Entries whose card was answered since
+        # they were pushed no longer match learning_cards and are dropped on the way.
+        now = time.time() if now is None else now
+        next_learn_due = None
+        for bucket, heap in self.learning.items():
+            while heap and (heap[0][0] <= now or self.learning_cards.get(heap[0][1]) != heap[0][0]):
+                learn_due, card_id = heapq.heappop(heap)
+                if self.learning_cards.get(card_id) == learn_due:
+                    del self.learning_cards[card_id]
+                    self.counts.setdefault(bucket, [0, 0, 0])[self.LEARN] += 1
+            if heap and (next_learn_due is None or heap[0][0] < next_learn_due):
+                next_learn_due = heap[0][0]
+        self.next_learn_due = next_learn_due
+
+    def breakdown(self, col, deck_name):
+        self.promote_learning()
+        dids = self.selected_ids(col, deck_name)
+        totals = [0, 0, 0]
+        for (did, odid), counts in self.counts.items():
+            if dids is None or did in dids or odid in dids:
+                for category in range(3):
+                    totals[category] += counts[category]
+        return totals
+
+    def category(self, card, now):
+        if card.queue in (-2, -3):
+            return None
+        if card.type == 0:
+            return self.NEW
+        if card.queue == 2:
+            return self.REVIEW if card.due <= self.today else None
+        if card.queue == 3:
+            return self.LEARN if card.due <= self.today else None
+        if card.queue in (1, 4):
+            return self.LEARN if card.due - self.collapse_time <= now else None
+        return None
+
+    def on_show(self, card):
+        if self.valid:
+            # Same clock for both, so a card is never counted by the heap and by category() at once.
+            now = time.time()
+            self.promote_learning(now)
+            self.shown_card = (card.id, (card.did, card.odid), self.category(card, now))
+
+    def on_answer(self, card):
+        shown_card, self.shown_card = self.shown_card, None
+        if not self.valid or not shown_card or shown_card[0] != card.id:
+            self.invalidate()
+            return
+        # Move the answered card from the category it was shown in to the one it landed in; a card
+        # leaving a filtered deck also moves back to its home deck.
+        now = time.time()
+        self.promote_learning(now)
+        if shown_card[2] is not None:
+            counts = self.counts.setdefault(shown_card[1], [0, 0, 0])
+            counts[shown_card[2]] = max(0, counts[shown_card[2]] - 1)
+        self.learning_cards.pop(card.id, None)
+        category = self.category(card, now)
+        if category is not None:
+            self.counts.setdefault((card.did, card.odid), [0, 0, 0])[category] += 1
+        elif card.queue in (1, 4):
+            self.schedule_learning((card.did, card.odid), card.id, card.due - self.collapse_time)
+        # A recount already in flight may have read the rows before this answer; drop its result.
+        self.epoch += 1
+        self.incremental_updates += 1
+
+class RefreshScheduler:
+    def __init__(self, callback, interval_ms=250):
+        self.callback = callback
+        self.interval_ms = interval_ms
+        self.dirty = False
+        self.requests = 0
+        self.refreshes = 0
+        self.timer = QTimer()
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.flush)
+
+    def request(self, *args):
+        self.requests += 1
+        self.dirty = True
+        if not self.timer.isActive():
+            # An interval of 0 coalesces everything queued within the current event-loop tick.
+            self.timer.start(self.interval_ms)
+
+    def flush(self):
+        if not self.dirty:
+            return
+        self.dirty = False
+        self.refreshes += 1
+        try:
+            self.callback()
+        except Exception as e:
+            logger.error(f"Error refreshing progress: {e}")
+
+    def saved_refreshes(self):
+        return self.requests - self.refreshes
+
+    def log_stats(self, *args):
+        logger.info(f"Refresh scheduler: {self.requests} requests, {self.refreshes} refreshes, "
+                    f"{self.saved_refreshes()} saved")
+
+class OverlayIconCache:
+    def __init__(self, glyphs, max_entries=64, max_count=999):
+        self.glyphs = glyphs
+        self.max_entries = max_entries
+        self.max_count = max_count
+        self.icons = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def display_text(self, count):
+        return f"{self.max_count}+" if count > self.max_count else str(count)
+
+    def get(self, count, scale=1.0):
+        key = (self.display_text(count), round(scale, 2))
+        icon = self.icons.get(key)
+        if icon is not None:
+            self.icons.move_to_end(key)
+            self.hits += 1
+            return icon
+        self.misses += 1
+        icon = self.render(*key)
+        self.icons[key] = icon
+        if len(self.icons) > self.max_entries:
+            self.icons.popitem(last=False)
+        return icon
+
+    def render(self, text, scale):
+        return QIcon(self.glyphs.badge(text, 16, scale))
+
+    def log_stats(self, *args):
+        logger.info(f"Overlay icon cache: {self.hits} hits, {self.misses} misses, {len(self.icons)} entries")
+        logger.info(f"Glyph cache: {self.glyphs.stats()}")
 
 class AnkiProgressHandler:
     def __init__(self):
         self.saved_due_card_count = 0
+        self.deck_counts = DeckCountService()
+        self.pushed_info = None
+        self.count_generation = 0
+        self.count_query_running = False
+        self.icon_cache = OverlayIconCache(GlyphCache(GLYPHS_DIR))
+        self.default_icon = None
+        self.thumbnails = ThumbnailService(THUMBNAILS_DIR)
+        self.rendered_state = None
+        self.applied_updates = 0
+        self.skipped_updates = 0
         self.tray_icon = None
+        self.pairs_model = None
         self.study_timer = QTimer()
+        self.study_timer.setSingleShot(True)
+        self.study_timer.timeout.connect(self.on_study_timer)
+        self.next_reminder_at = None
         self.last_notification_time = 0
         self.is_in_review = False
         self.notification_paused = False
         self.load_settings()
+        self.refresher = RefreshScheduler(self.update_progress, self.settings["refresh_interval_ms"])
+        self.image_store = ImageStore(IMAGES_DIR, self.settings["max_image_dimension"])
+        self.image_resolver = ImageResolver(IMAGES_DIR)
+        self.bulk_transfer = BulkTransfer(PAIRS_DB_PATH, IMAGES_DIR, self.settings["max_image_dimension"])
         self.load_message_image_pairs()
-        self.setup_tray()
         self.setup_study_reminder()
-        self.add_menu_to_anki()
+        gui_hooks.collection_did_load.append(self.deck_counts.invalidate_decks)
+        gui_hooks.collection_did_load.append(self.refresher.request)
+        gui_hooks.sync_did_finish.append(self.deck_counts.invalidate_decks)
+        gui_hooks.sync_did_finish.append(self.refresher.request)
+        gui_hooks.operation_did_execute.append(self.on_operation_did_execute)
         gui_hooks.reviewer_did_show_question.append(self.on_enter_review)
         gui_hooks.reviewer_will_end.append(self.on_exit_review)
-        gui_hooks.sync_did_finish.append(self.check_for_new_cards)
-        gui_hooks.state_did_change.append(self.on_state_change)
-        gui_hooks.reviewer_did_answer_card.append(lambda *args: self.check_for_new_cards())
+        gui_hooks.state_did_change.append(self.refresher.request)
+        gui_hooks.reviewer_did_answer_card.append(self.on_answer_card)
+        gui_hooks.profile_will_close.append(self.refresher.log_stats)
+        gui_hooks.profile_will_close.append(self.icon_cache.log_stats)
+        gui_hooks.profile_will_close.append(self.log_update_stats)
 
     def load_settings(self):
         self.settings_file = os.path.join(ADDON_PATH, "settings.json")
-        default_settings = {"notification_enabled": True, "notification_interval": 5, "selected_deck": "all"}
+        default_settings = {"notification_enabled": True, "notification_interval": 5, "selected_deck": "all",
+                            "refresh_interval_ms": 250, "max_image_dimension": 1600, "quiet_hours_start": "",
+                            "quiet_hours_end": "", "idle_threshold_minutes": 10, "max_backoff_factor": 8}
         self.settings = default_settings
-        if os.path.exists(self.settings_file):
-            try:
-                with open(self.settings_file, 'r', encoding='utf-8') as file:
-                    self.settings.update(json.load(file))
-            except Exception as e:
-                logger.error(f"Error loading settings: {e}")
+        self.settings.update(read_json(self.settings_file, {}))
         self.notification_enabled = self.settings["notification_enabled"]
         self.notification_interval = self.settings["notification_interval"]
         self.selected_deck = self.settings["selected_deck"]
@@ -64,86 +330,55 @@ class AnkiProgressHandler:
             "selected_deck": self.selected_deck
         })
         try:
-            with open(self.settings_file, 'w', encoding='utf-8') as file:
-                json.dump(self.settings, file, indent=4)
+            write_json(self.settings_file, self.settings, indent=4)
         except Exception as e:
             logger.error(f"Error saving settings: {e}")
             
     def load_message_image_pairs(self):
-        self.pairs_file = os.path.join(ADDON_PATH, "message_image_pairs.json")
         self.pairs = []
-        if os.path.exists(self.pairs_file):
-            try:
-                with open(self.pairs_file, 'r', encoding='utf-8') as file:
-                    pairs_data = json.load(file)
-                    for pair in pairs_data:
-                        self.pairs.append(MessageImagePair(pair.get("message", ""), pair.get("image_path", "")))
-            except Exception as e:
-                logger.error(f"Error loading message-image pairs: {e}")
-                
-        if not self.pairs:
-            msg_file_path = os.path.join(ADDON_PATH, "msg.txt")
-            if os.path.exists(msg_file_path):
-                try:
-                    with open(msg_file_path, 'r', encoding='utf-8') as file:
-                        for line in file:
-                            if line.strip():
-                                self.pairs.append(MessageImagePair(line.strip(), ""))
-                except Exception as e:
-                    logger.error(f"Error loading messages from msg.txt: {e}")
-
-    def save_message_image_pairs(self):
-        pairs_data = []
-        for pair in self.pairs:
-            pairs_data.append({
-                "message": pair.message,
-                "image_path": pair.image_path
-            })
         try:
-            with open(self.pairs_file, 'w', encoding='utf-8') as file:
-                json.dump(pairs_data, file, indent=4)
+            self.pair_store = PairStore(PAIRS_DB_PATH)
+            self.pair_store.migrate_legacy(os.path.join(ADDON_PATH, "message_image_pairs.json"),
+                                           os.path.join(ADDON_PATH, "msg.txt"), IMAGES_DIR)
+            self.read_pairs()
         except Exception as e:
-            logger.error(f"Error saving message-image pairs: {e}")
+            logger.error(f"Error loading message-image pairs: {e}")
 
-    def get_deck_names(self):
-        return ['all'] + sorted([d['name'] for d in mw.col.decks.all()]) if mw.col else ['all']
+    def read_pairs(self):
+        pairs = [MessageImagePair(message, image_path, pair_id)
+                 for pair_id, message, image_path, _ in self.pair_store.all()]
+        if self.pairs_model is not None:
+            self.pairs_model.reset_pairs(pairs)
+        else:
+            self.pairs[:] = pairs
 
-    def get_due_cards_count(self):
-        if not mw.col:
-            return 0
-        try:
-            if self.selected_deck == "all":
-                return len(mw.col.find_cards("-is:buried (is:new or is:due)"))
-            deck_name = self.selected_deck.replace("'", "\\'")
-            return len(mw.col.find_cards(f"deck:\"{deck_name}\" -is:buried (is:new or is:due)"))
-        except Exception as e:
-            logger.error(f"Error counting cards: {e}")
-            return 0
+    def pairs_changed(self):
+        send_to_notifier({"cmd": "reload_pairs"})
+
+    def get_deck_names(self):
+        return ['all'] + [name for name, _ in self.deck_counts.get_deck_names(mw.col)] if mw.col else ['all']
 
     def create_overlay_icon(self, count):
-        svg = f'''<svg width="100" height="100" viewBox="0 0 100 100">
-            <path fill="#ff0000" d="M50 5 L61.8 38.2 L95 38.2 L68.2 58.2 L79.1 90.5 L50 70 L20.9 90.5 L31.8 58.2 L5 38.2 L38.2 38.2Z"/>
-            <text x="{50 if count < 10 else 45 if count < 100 else 40}" y="65" font-family="Arial" font-size="{45 if count < 10 else 35 if count < 100 else 25}" font-weight="bold" fill="white" text-anchor="middle">{count}</text>
-        </svg>'''
-        pixmap = QPixmap(16, 16)
-        pixmap.fill(Qt.GlobalColor.transparent)
-        renderer = QSvgRenderer(bytearray(svg, encoding='utf-8'))
-        painter = QPainter(pixmap)
-        renderer.render(painter)
-        painter.end()
-        return QIcon(pixmap)
+        return self.icon_cache.get(count, mw.devicePixelRatioF())
 
     def setup_tray(self):
         self.tray_icon = QSystemTrayIcon(mw)
         icon_path = os.path.join(os.path.dirname(mw.pm.base), 'anki.ico')
         if os.path.exists(icon_path):
-            self.tray_icon.setIcon(QIcon(icon_path))
+            self.tray_icon.setIcon(self.get_default_icon())
         self.tray_icon.activated.connect(self.tray_icon_clicked)
         self.tray_icon.show()
+        # The new tray icon has not seen the current count yet.
+        self.rendered_state = None
+
+    def get_default_icon(self):
+        if self.default_icon is None:
+            self.default_icon = QIcon(os.path.join(os.path.dirname(mw.pm.base), 'anki.ico'))
+        return self.default_icon
 
     def tray_icon_clicked(self, reason):
         if reason in (QSystemTrayIcon.ActivationReason.Trigger, QSystemTrayIcon.ActivationReason.Context):
-            self.update_progress()
+            self.refresher.request()
 
     def add_menu_to_anki(self):
         self.menu = QMenu("Notifications", mw)
@@ -207,6 +442,14 @@ class AnkiProgressHandler:
         show_all_button.clicked.connect(self.show_all_items)
         buttons_layout.addWidget(show_all_button)
         
+        import_button = QPushButton("Import...")
+        import_button.clicked.connect(self.import_pairs_file)
+        buttons_layout.addWidget(import_button)
+        
+        export_button = QPushButton("Export...")
+        export_button.clicked.connect(self.export_pairs_file)
+        buttons_layout.addWidget(export_button)
+        
         save_button = QPushButton("Save Settings")
         save_button.clicked.connect(lambda: self.save_settings_from_dialog(dialog))
         buttons_layout.addWidget(save_button)
@@ -232,26 +475,91 @@ class AnkiProgressHandler:
             QMessageBox.warning(dialog, "Error", "Please enter a message or select an image (or both).")
             return
             
-        if image_path:
-            images_dir = os.path.join(ADDON_PATH, "imagens")
-            os.makedirs(images_dir, exist_ok=True)
-            image_name = os.path.basename(image_path)
-            destination_path = os.path.join(images_dir, image_name)
-            
-            if not os.path.exists(destination_path):
-                import shutil
-                shutil.copy(image_path, destination_path)
-                image_path = destination_path
-            else:
-                image_path = destination_path
-        
-        self.pairs.append(MessageImagePair(message, image_path))
-        self.save_message_image_pairs()
-        
         self.new_message_input.clear()
         self.selected_image_label.setText("No image selected")
         self.image_path = ""
         
+        if image_path:
+            self.import_image(image_path, lambda stored_path: self.insert_pair(message, stored_path))
+        else:
+            self.insert_pair(message, "")
+
+    def insert_pair(self, message, image_path):
+        try:
+            pair_id = self.pair_store.insert(message, image_path)
+        except Exception as e:
+            logger.error(f"Error saving message-image pair: {e}")
+            QMessageBox.warning(dialog, "Error", f"Could not save the content: {e}")
+            return
+        pair = MessageImagePair(message, image_path, pair_id)
+        # The All Content model wraps self.pairs, so rows are added through it while it exists.
+        if self.pairs_model is not None:
+            self.pairs_model.append_pair(pair)
+        else:
+            self.pairs.append(pair)
+        self.pairs_changed()
+
+    def import_image(self, source_path, on_stored):
+        progress = QProgressDialog("Copying image...", None, 0, 100, mw)
+        progress.setWindowTitle("Notifications")
+        progress.setMinimumDuration(500)
+
+        def done(stored_path, error):
+            progress.close()
+            if error:
+                logger.error(f"Error importing image {source_path}: {error}")
+                QMessageBox.warning(mw, "Error", f"Could not copy the image: {error}")
+            else:
+                self.image_resolver.add(stored_path)
+                on_stored(os.path.basename(stored_path))
+
+        self.image_store.import_image(source_path, done, progress.setValue)
+        
+    def import_pairs_file(self):
+        source_path, _ = QFileDialog.getOpenFileName(dialog, "Import Content", "",
+                                                     "Content (*.csv *.jsonl *.txt *.zip);;All Files (*)")
+        if not source_path:
+            return
+        progress = self.bulk_progress_dialog("Importing content...")
+
+        def done(count, error):
+            progress.close()
+            if error:
+                logger.error(f"Error importing {source_path}: {error}")
+                QMessageBox.warning(dialog, "Error", f"Could not import the content: {error}")
+                return
+            try:
+                self.read_pairs()
+            except Exception as e:
+                logger.error(f"Error loading message-image pairs: {e}")
+            self.pairs_changed()
+            QMessageBox.information(dialog, "Success", f"{count} items imported successfully!")
+
+        self.bulk_transfer.import_file(source_path, done, progress.setValue)
+
+    def export_pairs_file(self):
+        destination_path, _ = QFileDialog.getSaveFileName(dialog, "Export Content", "notifica_content.zip",
+                                                          "Zip with images (*.zip);;CSV (*.csv);;JSON lines (*.jsonl)")
+        if not destination_path:
+            return
+        progress = self.bulk_progress_dialog("Exporting content...")
+
+        def done(count, error):
+            progress.close()
+            if error:
+                logger.error(f"Error exporting to {destination_path}: {error}")
+                QMessageBox.warning(dialog, "Error", f"Could not export the content: {error}")
+            else:
+                QMessageBox.information(dialog, "Success", f"{count} items exported successfully!")
+
+        self.bulk_transfer.export_file(destination_path, done, progress.setValue)
+
+    def bulk_progress_dialog(self, text):
+        progress = QProgressDialog(text, None, 0, 100, dialog)
+        progress.setWindowTitle("Notifications")
+        progress.setMinimumDuration(500)
+        return progress
+
     def show_all_items(self):
         if not self.pairs:
             QMessageBox.warning(dialog, "Warning", "No content found.")
@@ -264,16 +572,6 @@ class AnkiProgressHandler:
         all_items_dialog.setStyleSheet("background-color: white; border: 1px solid black;")
         layout = QVBoxLayout()
         
-        self.item_rows = []
-        self.selected_items = []
-        self.last_selected_index = -1
-        
-        scroll_area = QScrollArea()
-        scroll_area.setWidgetResizable(True)
-        content_widget = QWidget()
-        content_layout = QVBoxLayout(content_widget)
-        content_layout.setContentsMargins(0, 0, 0, 0)
-        
         header_layout = QHBoxLayout()
         header_layout.setContentsMargins(5, 5, 5, 5)
         header_layout.setSpacing(0)
@@ -290,78 +588,18 @@ class AnkiProgressHandler:
         
         header_layout.addWidget(message_header)
         header_layout.addWidget(image_header)
-        
-        content_layout.addLayout(header_layout)
-        
-        items_frame = QFrame()
-        items_layout = QVBoxLayout(items_frame)
-        items_layout.setSpacing(5)
-        items_layout.setContentsMargins(0, 0, 0, 0)
-        
-        light_gray = "#e6e6e6"
-        darker_gray = "#d0d0d0"
-        
-        images_dir = os.path.join(ADDON_PATH, "imagens")
-        os.makedirs(images_dir, exist_ok=True)
-        image_files = [f for f in os.listdir(images_dir) if os.path.isfile(os.path.join(images_dir, f)) and 
-                      f.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.bmp'))]
-        
-        for i, pair in enumerate(self.pairs):
-            row_widget = QWidget()
-            
-            if i % 2 == 0:
-                row_widget.setStyleSheet(f"background-color: {light_gray}; border: 1px solid black; font-family: Arial; font-size: 16pt; color: black;")
-            else:
-                row_widget.setStyleSheet(f"background-color: {light_gray}; border: 1px solid black; font-family: Arial; font-size: 16pt; color: black;")
-            
-            row_layout = QHBoxLayout(row_widget)
-            row_layout.setContentsMargins(5, 5, 5, 5)
-            row_layout.setSpacing(0)
-            
-            message_text = pair.message if pair.message else "(No message)"
-            message_label = QLabel(message_text)
-            message_label.setWordWrap(True)
-            message_label.setStyleSheet("font-family: Arial; font-size: 16pt; color: black;")
-            message_label.setFixedWidth(650)
-            
-            image_widget = QLabel()
-            image_widget.setStyleSheet("font-family: Arial; font-size: 16pt; color: black;")
-            
-            image_path = None
-            
-            if pair.image_path and os.path.exists(pair.image_path):
-                image_path = pair.image_path
-            elif i < len(image_files):
-                image_path = os.path.join(images_dir, image_files[i])
-                pair.image_path = image_path
-            
-            if image_path and os.path.exists(image_path):
-                pixmap = QPixmap(image_path).scaled(100, 100, Qt.AspectRatioMode.KeepAspectRatio)
-                image_widget.setPixmap(pixmap)
-            else:
-                image_widget.setText("(No image)")
-                
-            image_widget.setFixedSize(120, 120)
-            image_widget.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            
-            row_layout.addWidget(message_label)
-            row_layout.addWidget(image_widget)
-            
-            row_widget.setProperty("item_index", i)
-            
-            def create_click_handler(idx):
-                return lambda evt: self.select_item_in_dialog(idx, self.item_rows, evt)
-                
-            row_widget.mousePressEvent = create_click_handler(i)
-            
-            self.item_rows.append(row_widget)
-            items_layout.addWidget(row_widget)
-        
-        self.save_message_image_pairs()
-        
-        content_layout.addWidget(items_frame)
-        scroll_area.setWidget(content_widget)
-        layout.addWidget(scroll_area)
+        layout.addLayout(header_layout)
+        
+        # Rows are painted by the delegate on demand, so only the visible ones cost anything.
+        self.pairs_model = PairListModel(self.pairs, self.thumbnails, self.image_resolver, all_items_dialog)
+        self.pairs_view = QListView()
+        self.pairs_view.setModel(self.pairs_model)
+        self.pairs_view.setItemDelegate(PairItemDelegate(self.pairs_view))
+        self.pairs_view.setUniformItemSizes(True)
+        self.pairs_view.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.pairs_view.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.pairs_view.selectionModel().selectionChanged.connect(self.update_selection_status)
+        layout.addWidget(self.pairs_view)
         
         self.selection_status = QLabel("No items selected")
         self.selection_status.setStyleSheet("font-family: Arial; font-size: 14pt; color: black;")
@@ -394,47 +632,32 @@ class AnkiProgressHandler:
         all_items_dialog.setLayout(layout)
         all_items_dialog.show()
 
-    def select_item_in_dialog(self, index, row_widgets, event):
-        light_gray = "#e6e6e6"
-        darker_gray = "#d0d0d0"
-        selected_color = "#d0d0ff"
-        
-        ctrl_pressed = event.modifiers() & Qt.KeyboardModifier.ControlModifier
-        
-        if not ctrl_pressed:
-            self.selected_items = []
-            for i, row in enumerate(row_widgets):
-                if i % 2 == 0:
-                    row.setStyleSheet(f"background-color: {light_gray}; border: 1px solid black; font-family: Arial; font-size: 16pt; color: black;")
-                else:
-                    row.setStyleSheet(f"background-color: {light_gray}; border: 1px solid black; font-family: Arial; font-size: 16pt; color: black;")
-        
-        if ctrl_pressed and index in self.selected_items:
-            self.selected_items.remove(index)
-            if index % 2 == 0:
-                row_widgets[index].setStyleSheet(f"background-color: {light_gray}; border: 1px solid black; font-family: Arial; font-size: 16pt; color: black;")
-            else:
-                row_widgets[index].setStyleSheet(f"background-color: {light_gray}; border: 1px solid black; font-family: Arial; font-size: 16pt; color: black;")
-        else:
-            if index not in self.selected_items:
-                self.selected_items.append(index)
-            row_widgets[index].setStyleSheet(f"background-color: {selected_color}; border: 1px solid black; font-family: Arial; font-size: 16pt; color: black;")
-        
-        self.last_selected_index = index
-        
-        if len(self.selected_items) == 0:
+    def selected_rows(self):
+        return sorted(index.row() for index in self.pairs_view.selectionModel().selectedRows())
+
+    def current_selected_row(self):
+        rows = self.selected_rows()
+        if not rows:
+            return -1
+        current = self.pairs_view.currentIndex().row()
+        return current if current in rows else rows[-1]
+
+    def update_selection_status(self, *args):
+        selected_count = len(self.selected_rows())
+        if selected_count == 0:
             self.selection_status.setText("No items selected")
-        elif len(self.selected_items) == 1:
+        elif selected_count == 1:
             self.selection_status.setText(f"1 item selected")
         else:
-            self.selection_status.setText(f"{len(self.selected_items)} items selected")
+            self.selection_status.setText(f"{selected_count} items selected")
 
     def edit_selected_message_in_dialog(self):
-        if self.last_selected_index < 0 or not self.selected_items:
-            QMessageBox.warning(dialog, "Warning", "No message selected.")
+        row = self.current_selected_row()
+        if row < 0:
+            QMessageBox.warning(all_items_dialog, "Warning", "No message selected.")
             return
             
-        pair = self.pairs[self.last_selected_index]
+        pair = self.pairs[row]
         
         dialog = QDialog(mw, Qt.WindowType.Window | Qt.WindowType.WindowStaysOnTopHint)
         dialog.setWindowTitle("Edit Message")
@@ -467,22 +690,21 @@ class AnkiProgressHandler:
         
         if dialog.exec() == QDialog.DialogCode.Accepted:
             new_message = message_input.toPlainText().strip()
-            self.pairs[self.last_selected_index].message = new_message
-            self.save_message_image_pairs()
-            
-            current_row = self.item_rows[self.last_selected_index]
-            message_label = current_row.layout().itemAt(0).widget()
-            display_message = new_message if new_message else "(No message)"
-            message_label.setText(display_message)
+            self.pairs[row].message = new_message
+            self.pair_store.update(self.pairs[row].pair_id, message=new_message)
+            self.pairs_changed()
+            self.pairs_model.refresh_row(row)
 
     def view_selected_image_in_dialog(self):
-        if self.last_selected_index < 0 or not self.selected_items:
-            QMessageBox.warning(dialog, "Warning", "No image selected.")
+        row = self.current_selected_row()
+        if row < 0:
+            QMessageBox.warning(all_items_dialog, "Warning", "No image selected.")
             return
             
-        pair = self.pairs[self.last_selected_index]
-        if not pair.image_path or not os.path.exists(pair.image_path):
-            QMessageBox.warning(dialog, "Warning", "No image associated with this item.")
+        pair = self.pairs[row]
+        image_path = self.image_resolver.resolve(pair.image_path)
+        if not image_path:
+            QMessageBox.warning(all_items_dialog, "Warning", "No image associated with this item.")
             return
             
         dialog = QDialog(mw, Qt.WindowType.Window | Qt.WindowType.WindowStaysOnTopHint)
@@ -496,69 +718,63 @@ class AnkiProgressHandler:
             message_label.setStyleSheet("font-family: Arial; font-size: 16pt; color: black;")
             layout.addWidget(message_label)
         
-        pixmap = QPixmap(pair.image_path).scaled(400, 400, Qt.AspectRatioMode.KeepAspectRatio)
         image_label = QLabel()
-        image_label.setPixmap(pixmap)
+        image_label.setMinimumSize(100, 100)
+        self.set_thumbnail(image_label, image_path, 400)
         layout.addWidget(image_label)
         
         dialog.setLayout(layout)
         dialog.exec()
     
     def edit_selected_image_in_dialog(self):
-        if self.last_selected_index < 0 or not self.selected_items:
-            QMessageBox.warning(dialog, "Warning", "No image selected.")
+        row = self.current_selected_row()
+        if row < 0:
+            QMessageBox.warning(all_items_dialog, "Warning", "No image selected.")
             return
-            
-        pair = self.pairs[self.last_selected_index]
         
+        pair = self.pairs[row]
         image_path, _ = QFileDialog.getOpenFileName(mw, "Select an image", "", "Images (*.png *.jpg *.jpeg *.gif *.bmp)")
         if not image_path:
             return
-            
-        images_dir = os.path.join(ADDON_PATH, "imagens")
-        os.makedirs(images_dir, exist_ok=True)
-        image_name = os.path.basename(image_path)
-        destination_path = os.path.join(images_dir, image_name)
-        
-        if image_path != destination_path:
-            import shutil
-            shutil.copy(image_path, destination_path)
-        
-        self.pairs[self.last_selected_index].image_path = destination_path
-        self.save_message_image_pairs()
-        
-        current_row = self.item_rows[self.last_selected_index]
-        image_label = current_row.layout().itemAt(1).widget()
-        pixmap = QPixmap(destination_path).scaled(100, 100, Qt.AspectRatioMode.KeepAspectRatio)
-        image_label.setPixmap(pixmap)
-        image_label.setText("")
+        self.import_image(image_path, lambda stored_path: self.set_pair_image(pair, stored_path))
+
+    def set_pair_image(self, pair, image_path):
+        pair.image_path = image_path
+        self.pair_store.update(pair.pair_id, image_path=image_path)
+        self.pairs_changed()
+        if pair in self.pairs:
+            self.pairs_model.refresh_row(self.pairs.index(pair))
+
+    def set_thumbnail(self, label, image_path, size):
+        def apply(pixmap):
+            if pixmap.isNull():
+                label.setText("(No image)")
+            else:
+                label.setPixmap(pixmap)
+        self.thumbnails.request(image_path, size, apply)
     
     def remove_selected_items_in_dialog(self):
-        if not self.selected_items:
-            QMessageBox.warning(dialog, "Warning", "No items selected.")
+        rows = self.selected_rows()
+        if not rows:
+            QMessageBox.warning(all_items_dialog, "Warning", "No items selected.")
             return
         
-        if len(self.selected_items) == 1:
+        if len(rows) == 1:
             confirm_message = "Are you sure you want to remove this item?"
         else:
-            confirm_message = f"Are you sure you want to remove {len(self.selected_items)} items?"
+            confirm_message = f"Are you sure you want to remove {len(rows)} items?"
             
-        confirm = QMessageBox.question(dialog, "Confirm", confirm_message, 
+        confirm = QMessageBox.question(all_items_dialog, "Confirm", confirm_message, 
                                       QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
         if confirm == QMessageBox.StandardButton.Yes:
-            indices_to_remove = sorted(self.selected_items, reverse=True)
-            
-            for index in indices_to_remove:
-                self.pairs.pop(index)
+            self.pair_store.delete([self.pairs[row].pair_id for row in rows])
+            self.pairs_model.remove_rows(rows)
+            self.pairs_changed()
             
-            self.save_message_image_pairs()
-            
-            if len(self.selected_items) == 1:
-                QMessageBox.information(dialog, "Success", "Item removed successfully!")
+            if len(rows) == 1:
+                QMessageBox.information(all_items_dialog, "Success", "Item removed successfully!")
             else:
-                QMessageBox.information(dialog, "Success", f"{len(self.selected_items)} items removed successfully!")
-                
-            self.show_all_items()
+                QMessageBox.information(all_items_dialog, "Success", f"{len(rows)} items removed successfully!")
 
     def save_settings_from_dialog(self, dialog):
         try:
@@ -570,47 +786,78 @@ class AnkiProgressHandler:
             self.selected_deck = self.deck_combo.currentText()
             self.save_settings()
             self.setup_study_reminder()
-            self.update_progress()
+            self.refresher.request()
             
-            close_notification()
             if self.notification_enabled:
-                QTimer.singleShot(1000, start_notification_process)
+                start_notification_process()
+            else:
+                stop_notification_process()
                 
             dialog.close()
         except ValueError as e:
             QMessageBox.warning(dialog, "Error", str(e))
 
     def setup_study_reminder(self):
-        self.study_timer.stop()
-        try:
-            self.study_timer.timeout.disconnect()
-        except TypeError:
-            pass
         if self.notification_enabled and not self.is_in_review:
-            interval_ms = self.notification_interval * 60 * 1000
-            self.study_timer.timeout.connect(self.check_and_show_reminder)
-            self.study_timer.start(interval_ms)
+            self.next_reminder_at = time.time() + self.notification_interval * 60
+        else:
+            self.next_reminder_at = None
+        self.schedule_wakeup()
+
+    def schedule_wakeup(self):
+        # One single-shot timer covers both the reminder cadence and the next moment the due
+        # count can change, so nothing wakes up while there is nothing due and nothing to recount.
+        self.study_timer.stop()
+        now = time.time()
+        wakeups = []
+        if self.next_reminder_at is not None and self.saved_due_card_count > 0:
+            if self.next_reminder_at <= now:
+                # Keep the cadence's phase across stretches where nothing was due.
+                interval = self.notification_interval * 60
+                self.next_reminder_at += math.ceil((now - self.next_reminder_at) / interval) * interval
+            wakeups.append(self.next_reminder_at)
+        next_change = self.deck_counts.next_change_time()
+        if next_change is not None and next_change > now:
+            wakeups.append(next_change)
+        if not wakeups:
+            return
+        delay = min(min(wakeups) - now, MAX_WAKEUP_SECONDS)
+        self.study_timer.start(max(0, int(delay * 1000)) + 50)
+
+    def on_study_timer(self):
+        now = time.time()
+        next_change = self.deck_counts.next_change_time()
+        if next_change is not None and next_change <= now:
+            # apply_progress reschedules once the recount lands.
+            self.refresher.request()
+        if self.next_reminder_at is not None and self.next_reminder_at <= now:
+            self.next_reminder_at = now + self.notification_interval * 60
+            self.check_and_show_reminder()
+        self.schedule_wakeup()
 
     def check_and_show_reminder(self):
-        if not self.is_in_review and not self.notification_paused and self.get_due_cards_count() > 0:
-            toggle_notification()
+        # The notifier pops up on its own schedule; a reminder tick only makes sure it is running.
+        if not self.is_in_review and not self.notification_paused and self.saved_due_card_count > 0:
+            ensure_notification_process()
 
-    def check_for_new_cards(self):
-        if not mw.col:
-            return
-        current_due_cards = self.get_due_cards_count()
-        if current_due_cards != self.saved_due_card_count:
-            self.update_progress()
+    def on_answer_card(self, reviewer, card, ease):
+        self.deck_counts.on_answer(card)
+        self.refresher.request()
 
-    def on_state_change(self, state, *args):
-        self.check_for_new_cards()
+    def on_operation_did_execute(self, changes, handler):
+        # Answers are applied incrementally in on_answer_card; undo, edits, bury/suspend etc. need a recount.
+        if changes.deck:
+            self.deck_counts.invalidate_decks()
+        elif handler is not mw.reviewer and (changes.card or changes.study_queues):
+            self.deck_counts.invalidate()
 
     def on_enter_review(self, card):
+        self.deck_counts.on_show(card)
         current_deck = mw.col.decks.name(card.did)
         if current_deck == self.selected_deck or self.selected_deck == "all":
             self.is_in_review = True
             self.notification_paused = True
-            self.study_timer.stop()
+            self.setup_study_reminder()
             save_state(True, True)
             
     def on_exit_review(self):
@@ -621,358 +868,196 @@ class AnkiProgressHandler:
                 self.notification_paused = False
                 self.setup_study_reminder()
                 save_state(True, False)
-        self.update_progress()
+        self.refresher.request()
 
     def update_progress(self, *args):
         if not mw.col:
             return
-        due_card_count = self.get_due_cards_count()
+        # Every request supersedes the previous one; only one query runs at a time, and one
+        # whose counts were invalidated while it ran is followed by a fresh query.
+        self.count_generation += 1
+        if not self.count_query_running:
+            self.start_count_query()
+
+    def start_count_query(self):
+        if not mw.col:
+            self.count_query_running = False
+            return
+        if not self.deck_counts.needs_recount():
+            self.count_query_running = False
+            self.apply_progress(self.deck_counts.breakdown(mw.col, self.selected_deck))
+            return
+        generation = self.count_generation
+        epoch = self.deck_counts.epoch
+        self.count_query_running = True
+        op = QueryOp(
+            parent=mw,
+            op=DeckCountService.query,
+            success=lambda result: self.on_counts_ready(epoch, result),
+        )
+        op.failure(lambda error: self.on_counts_failed(generation, error))
+        op.run_in_background()
+
+    def on_counts_ready(self, epoch, result):
+        self.count_query_running = False
+        self.deck_counts.apply(result, epoch)
+        # Applies the fresh counts, or queries again if they were superseded while this one ran.
+        self.start_count_query()
+
+    def on_counts_failed(self, generation, error):
+        self.count_query_running = False
+        logger.error(f"Error counting cards: {error}")
+        if generation != self.count_generation:
+            self.start_count_query()
+
+    def apply_progress(self, breakdown):
+        new_count, learn_count, review_count = breakdown
+        due_card_count = new_count + learn_count + review_count
+        self.saved_due_card_count = due_card_count
+        self.schedule_wakeup()
+        state = (due_card_count, self.selected_deck)
+        if state == self.rendered_state:
+            self.skipped_updates += 1
+        else:
+            self.rendered_state = state
+            self.applied_updates += 1
+            self.render_progress(due_card_count)
+
+        info = {
+            "count": due_card_count,
+            "deck": self.selected_deck,
+            "new": new_count,
+            "learn": learn_count,
+            "review": review_count
+        }
+        if info == self.pushed_info:
+            return
+        self.pushed_info = info
+        try:
+            write_json(CARD_COUNT_PATH, info)
+        except Exception as e:
+            logger.error(f"Error saving card count: {e}")
+        send_to_notifier(dict(info, cmd="count"))
+
+    def render_progress(self, due_card_count):
         if due_card_count > 0:
             overlay_icon = self.create_overlay_icon(due_card_count)
             mw.setWindowIcon(overlay_icon)
             if self.tray_icon:
                 self.tray_icon.setIcon(overlay_icon)
         else:
-            default_icon = QIcon(os.path.join(os.path.dirname(mw.pm.base), 'anki.ico'))
+            default_icon = self.get_default_icon()
             mw.setWindowIcon(default_icon)
             if self.tray_icon:
                 self.tray_icon.setIcon(default_icon)
         deck_info = f" - {self.selected_deck}" if self.selected_deck != "all" else ""
         mw.setWindowTitle(f"Anki ({due_card_count}){deck_info}" if due_card_count > 0 else "Anki")
-        self.saved_due_card_count = due_card_count
-        
-        try:
-            info = {
-                "count": due_card_count,
-                "deck": self.selected_deck
-            }
-            with open(os.path.join(ADDON_PATH, "card_count.json"), "w", encoding='utf-8') as f:
-                json.dump(info, f)
-        except Exception as e:
-            logger.error(f"Error saving card count: {e}")
+
+    def log_update_stats(self, *args):
+        logger.info(f"Progress updates: {self.applied_updates} applied, {self.skipped_updates} skipped")
+        logger.info(f"Due counts: {self.deck_counts.full_counts} full, "
+                    f"{self.deck_counts.incremental_updates} incremental")
+
+def send_to_notifier(message):
+    socket = QLocalSocket()
+    socket.connectToServer(IPC_SERVER_NAME)
+    if not socket.waitForConnected(100):
+        return False
+    socket.write((json.dumps(message) + "\n").encode("utf-8"))
+    socket.waitForBytesWritten(100)
+    socket.disconnectFromServer()
+    return True
 
 def save_state(active, in_review=False):
     try:
-        with open(CONFIG_PATH, "w", encoding='utf-8') as f:
-            json.dump({"active": active, "in_review": in_review}, f)
+        write_json(CONFIG_PATH, {"active": active, "in_review": in_review})
     except Exception as e:
         logger.error(f"Error saving state: {e}")
+    send_to_notifier({"cmd": "state", "active": active, "in_review": in_review})
 
 def start_notification_process():
-    script_path = os.path.join(ADDON_PATH, "star_notification_bg.py")
-    with open(script_path, "w", encoding="utf-8") as f:
-        f.write("""
-import sys
-from PyQt6.QtWidgets import QApplication, QWidget, QLabel, QMenu, QSystemTrayIcon, QHBoxLayout
-from PyQt6.QtCore import QTimer, Qt, QPointF
-from PyQt6.QtGui import QPainter, QPainterPath, QBrush, QColor, QFont, QPixmap, QPen, QIcon
-import os
-import json
-import random
-import math
-
-ADDON_PATH = os.path.dirname(__file__)
-CONFIG_PATH = os.path.join(ADDON_PATH, "star_config.json")
-SETTINGS_PATH = os.path.join(ADDON_PATH, "settings.json")
-PAIRS_PATH = os.path.join(ADDON_PATH, "message_image_pairs.json")
-IMAGES_DIR = os.path.join(ADDON_PATH, "imagens")
-CARD_COUNT_PATH = os.path.join(ADDON_PATH, "card_count.json")
-
-class StarNotification(QWidget):
-    def __init__(self):
-        super().__init__()
-        try:
-            with open(CONFIG_PATH, "r", encoding='utf-8') as f:
-                config = json.load(f)
-                if config.get("in_review", False):
-                    self.setVisible(False)
-                    self.cycle_timer = QTimer(self)
-                    self.check_timer = QTimer(self)
-                    self.check_timer.timeout.connect(self.check_status)
-                    self.check_timer.start(1000)
-                    return
-        except Exception as e:
-            print(f"Error checking initial review state: {e}")
-
-        self.setWindowFlags(Qt.WindowType.WindowStaysOnTopHint | Qt.WindowType.FramelessWindowHint | Qt.WindowType.Tool)
-        self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground, False)
-        self.tray_icon = None
-        self.blink_state = True
-        self.setupUI()
-        self.setup_tray()
-        self.load_settings()
-        self.show_timer = QTimer(self)
-        self.show_timer.setSingleShot(True)
-        self.show_timer.timeout.connect(self.start_blinking)
-        self.blink_timer = QTimer(self)
-        self.blink_timer.timeout.connect(self.toggle_blink)
-        self.blink_end_timer = QTimer(self)
-        self.blink_end_timer.setSingleShot(True)
-        self.blink_end_timer.timeout.connect(self.hide_notification)
-        self.cycle_timer = QTimer(self)
-        self.cycle_timer.timeout.connect(self.show_notification)
-        self.check_timer = QTimer(self)
-        self.check_timer.timeout.connect(self.check_status)
-        self.check_timer.start(1000)
-        self.start_notification_cycle()
-
-    def setupUI(self):
-        self.setFixedSize(400, 150)
-        self.setStyleSheet("background-color: transparent;")
-        self.layout = QHBoxLayout(self)
-        self.layout.setContentsMargins(0, 0, 0, 0)
-        self.layout.setSpacing(0)
-        
-        self.content_widget = QWidget(self)
-        self.content_widget.setFixedSize(400, 150)
-        self.content_widget.setStyleSheet("background-color: white; border: 5px solid red;")
-        self.content_layout = QHBoxLayout(self.content_widget)
-        self.content_layout.setContentsMargins(5, 5, 5, 5)
-        self.content_layout.setSpacing(5)
-        
-        self.star_pixmap = self.create_star_pixmap(30, 30)
-        self.star_label = QLabel(self.content_widget)
-        self.star_label.setPixmap(self.star_pixmap)
-        self.star_label.setStyleSheet("border: none; background-color: transparent;")
-        self.content_layout.addWidget(self.star_label)
-        
-        self.image_label = QLabel(self.content_widget)
-        self.image_label.setFixedSize(100, 100)
-        self.image_label.setStyleSheet("border: none; background-color: transparent;")
-        self.content_layout.addWidget(self.image_label)
-        
-        self.text_label = QLabel(self.content_widget)
-        self.text_label.setWordWrap(True)
-        self.text_label.setStyleSheet("color: black; font: bold 12px Arial; border: none; background-color: transparent;")
-        self.content_layout.addWidget(self.text_label)
-        
-        self.layout.addWidget(self.content_widget)
-        self.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
-        self.customContextMenuRequested.connect(self.show_context_menu)
-        self.position_near_clock()
-
-    def start_notification_cycle(self):
-        self.cycle_timer.start(self.notification_interval)
-        self.show_notification()
-
-    def show_notification(self):
-        self.update_content()
-        self.show()
-        self.raise_()
-        self.setVisible(True)
-        self.blink_state = True
-        self.show_timer.start(5000)
-
-    def start_blinking(self):
-        self.blink_timer.start(500)
-        self.blink_end_timer.start(2000)
-
-    def toggle_blink(self):
-        self.blink_state = not self.blink_state
-        self.setVisible(self.blink_state)
-
-    def hide_notification(self):
-        self.blink_timer.stop()
-        self.setVisible(True)
-        self.hide()
-        self.tray_icon.show()
+    save_state(True)
+    # A running notifier reloads in place; only spawn a new interpreter when none answers.
+    if send_to_notifier({"cmd": "reload_settings"}):
+        send_to_notifier({"cmd": "reload_pairs"})
+        return
+    spawn_notifier_python([os.path.join(ADDON_PATH, "star_notification_bg.py")])
 
-    def create_star_pixmap(self, width, height):
-        pixmap = QPixmap(width, height)
-        pixmap.fill(Qt.GlobalColor.transparent)
-        painter = QPainter(pixmap)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-        path = QPainterPath()
-        center = QPointF(width / 2, height / 2)
-        radius_outer = min(width, height) / 2
-        radius_inner = radius_outer * 0.4
-        for i in range(5):
-            angle = i * 2 * 3.14159 / 5 - 3.14159 / 2
-            angle_inner = angle + 3.14159 / 5
-            x_outer = center.x() + radius_outer * math.cos(angle)
-            y_outer = center.y() + radius_outer * math.sin(angle)
-            x_inner = center.x() + radius_inner * math.cos(angle_inner)
-            y_inner = center.y() + radius_inner * math.sin(angle_inner)
-            if i == 0:
-                path.moveTo(x_outer, y_outer)
-            else:
-                path.lineTo(x_outer, y_outer)
-            path.lineTo(x_inner, y_inner)
-        path.closeSubpath()
-        painter.setPen(Qt.GlobalColor.red)
-        painter.setBrush(QBrush(QColor(255, 0, 0, 180)))
-        painter.drawPath(path)
-        painter.end()
-        return pixmap
+def spawn_notifier_python(args):
+    if sys.platform == "win32":
+        creationflags = subprocess.DETACHED_PROCESS | subprocess.CREATE_NO_WINDOW | subprocess.CREATE_NEW_PROCESS_GROUP
+        subprocess.Popen(["pythonw"] + args, creationflags=creationflags)
+    else:
+        subprocess.Popen(["python3"] + args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True)
 
-    def load_settings(self):
-        default_settings = {"notification_interval": 5}
-        self.settings = default_settings
-        if os.path.exists(SETTINGS_PATH):
-            try:
-                with open(SETTINGS_PATH, 'r', encoding='utf-8') as file:
-                    self.settings.update(json.load(file))
-            except Exception as e:
-                print(f"Error loading settings: {e}")
-        self.notification_interval = self.settings["notification_interval"] * 60 * 1000
-        
-        self.pairs = []
-        if os.path.exists(PAIRS_PATH):
-            try:
-                with open(PAIRS_PATH, 'r', encoding='utf-8') as file:
-                    self.pairs = json.load(file)
-            except Exception as e:
-                print(f"Error loading message-image pairs: {e}")
-        
-        if not self.pairs:
-            self.pairs = []
-            msg_file = os.path.join(ADDON_PATH, "msg.txt")
-            if os.path.exists(msg_file):
-                try:
-                    with open(msg_file, 'r', encoding='utf-8') as f:
-                        for line in f:
-                            if line.strip():
-                                self.pairs.append({"message": line.strip(), "image_path": ""})
-                except Exception as e:
-                    print(f"Error loading messages from msg.txt: {e}")
+def precompile_notifier():
+    # The notifier runs under the system interpreter, so its bytecode must be compiled by that
+    # interpreter rather than by Anki's bundled one. Only done once per source change.
+    source_path = os.path.join(ADDON_PATH, "star_notification.py")
+    cache_dir = os.path.join(ADDON_PATH, "__pycache__")
+    try:
+        source_mtime = os.path.getmtime(source_path)
+        if any(name.startswith("star_notification.") and os.path.getmtime(os.path.join(cache_dir, name)) >= source_mtime
+               for name in os.listdir(cache_dir)):
+            return
+    except OSError:
+        pass
+    try:
+        spawn_notifier_python(["-m", "compileall", "-q", source_path])
+    except Exception as e:
+        logger.error(f"Error precompiling notifier: {e}")
 
-    def setup_tray(self):
-        self.tray_icon = QSystemTrayIcon(QIcon(self.star_pixmap), self)
-        self.tray_icon.setContextMenu(self.create_tray_menu())
-        self.tray_icon.show()
-        self.tray_icon.activated.connect(self.tray_icon_clicked)
+def ensure_notification_process():
+    if not read_json(CONFIG_PATH, {}).get("active", False):
+        start_notification_process()
 
-    def create_tray_menu(self):
-        menu = QMenu()
-        close_action = menu.addAction("Close")
-        close_action.triggered.connect(self.close_notification)
-        return menu
+def toggle_notification():
+    is_active = read_json(CONFIG_PATH, {}).get("active", False)
+    if not is_active or not send_to_notifier({"cmd": "show"}):
+        start_notification_process()
 
-    def tray_icon_clicked(self, reason):
-        if reason == QSystemTrayIcon.ActivationReason.Trigger:
-            self.show_notification()
+def stop_notification_process():
+    save_state(False)
 
-    def update_content(self):
-        # Load card count from card_count.json
-        due_cards = 0
-        selected_deck = "all"
-        try:
-            with open(CARD_COUNT_PATH, 'r', encoding='utf-8') as f:
-                card_info = json.load(f)
-                due_cards = card_info.get("count", 0)
-                selected_deck = card_info.get("deck", "all")
-        except Exception as e:
-            print(f"Error loading card count: {e}")
+def close_notification():
+    stop_notification_process()
+    QMessageBox.information(dialog, "Info", "Notification stopped (it will close shortly)")
 
-        # Only show notification if there are due cards
-        if due_cards == 0:
-            self.hide()
-            return
+def run_startup_phases(phases):
+    # Each phase runs in its own event-loop turn so the profile opens without waiting on us.
+    startup_start = time.perf_counter()
 
-        if not self.pairs:
-            self.text_label.setText("No content available")
-            self.image_label.clear()
+    def run_phase(index):
+        if index >= len(phases):
+            logger.info(f"Notifier startup finished in {(time.perf_counter() - startup_start) * 1000:.1f} ms")
             return
-            
-        pair = random.choice(self.pairs)
-        
-        message = pair.get("message", "")
-        if not message:
-            message = "(No message)"
-            
-        # Add card count to the message
-        deck_text = f" no deck {selected_deck}" if selected_deck != "all" else ""
-        card_status = f"Faltam {due_cards} cards{deck_text}!"
-        full_message = f"{message}<br><br><b>{card_status}</b>"
-        
-        self.text_label.setText(full_message)
-        
-        image_path = pair.get("image_path", "")
-        if image_path and os.path.exists(image_path):
-            pixmap = QPixmap(image_path).scaled(100, 100, Qt.AspectRatioMode.KeepAspectRatio)
-            self.image_label.setPixmap(pixmap)
-        else:
-            self.image_label.clear()
-
-    def position_near_clock(self):
-        screen_rect = QApplication.primaryScreen().availableGeometry()
-        self.move(screen_rect.width() - self.width() - 10, screen_rect.height() - self.height() - 40)
-
-    def show_context_menu(self, position):
-        menu = QMenu()
-        close_action = menu.addAction("Close Notification")
-        close_action.triggered.connect(self.close_notification)
-        menu.exec(self.mapToGlobal(position))
-
-    def close_notification(self):
-        with open(CONFIG_PATH, "w", encoding='utf-8') as f:
-            json.dump({"active": False}, f)
-        self.tray_icon.hide()
-        self.close()
-        QApplication.quit()
-
-    def check_status(self):
+        name, phase = phases[index]
+        phase_start = time.perf_counter()
         try:
-            with open(CONFIG_PATH, "r", encoding='utf-8') as f:
-                config = json.load(f)
-                if not config.get("active", True):
-                    self.tray_icon.hide()
-                    self.close()
-                    QApplication.quit()
-                    return
-                    
-                if config.get("in_review", False):
-                    self.cycle_timer.stop()
-                    self.blink_timer.stop()
-                    self.show_timer.stop()
-                    if self.isVisible():
-                        self.hide()
-                    return
-                else:
-                    if not self.cycle_timer.isActive():
-                        self.cycle_timer.start(self.notification_interval)
+            phase()
         except Exception as e:
-            print(f"Error checking status: {e}")
-
-if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    window = StarNotification()
-    sys.exit(app.exec())
-""")
-    save_state(True)
-    if sys.platform == "win32":
-        creationflags = subprocess.DETACHED_PROCESS | subprocess.CREATE_NO_WINDOW | subprocess.CREATE_NEW_PROCESS_GROUP
-        subprocess.Popen(["pythonw", script_path], creationflags=creationflags)
-    else:
-        subprocess.Popen(["python3", script_path], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True)
+            logger.error(f"Error in startup phase '{name}': {e}")
+        logger.info(f"Startup phase '{name}' took {(time.perf_counter() - phase_start) * 1000:.1f} ms")
+        QTimer.singleShot(0, lambda: run_phase(index + 1))
 
-def toggle_notification():
-    try:
-        with open(CONFIG_PATH, "r", encoding='utf-8') as f:
-            config = json.load(f)
-            is_active = config.get("active", False)
-    except:
-        is_active = False
-    if not is_active:
-        start_notification_process()
-
-def close_notification():
-    save_state(False)
-    QMessageBox.information(dialog, "Info", "Notification stopped (it will close shortly)")
+    QTimer.singleShot(0, lambda: run_phase(0))
 
-def initialize_handler():
+def create_handler():
     global handler
-    save_state(False)
-    time.sleep(2)
     handler = AnkiProgressHandler()
-    gui_hooks.collection_did_load.append(lambda args: handler.update_progress())
-    gui_hooks.reviewer_did_show_question.append(lambda args: handler.update_progress())
-    gui_hooks.reviewer_did_answer_card.append(lambda *args: handler.update_progress())
-    gui_hooks.reviewer_will_end.append(handler.update_progress)
-    gui_hooks.sync_did_finish.append(handler.update_progress)
-    start_notification_process()
+
+def initialize_handler():
+    run_startup_phases([
+        ("handler", create_handler),
+        ("tray", lambda: handler.setup_tray()),
+        ("menu", lambda: handler.add_menu_to_anki()),
+        ("due count", lambda: handler.update_progress()),
+        ("notifier", start_notification_process),
+    ])
 
 if not os.path.exists(CONFIG_PATH):
     save_state(True)
 
+precompile_notifier()
+
 gui_hooks.profile_did_open.append(initialize_handler)
@@ -0,0 +1,42 @@
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+# Runs slow file work (image copies, bulk import/export) on a worker thread. A job is a
+# callable taking a progress(percent) function; its result and any error come back through
+# queued signals, so on_done and on_progress always run on the thread that started the job.
+
+class _JobSignals(QObject):
+    progress = pyqtSignal(int)
+    finished = pyqtSignal(object, str)
+
+class _JobTask(QRunnable):
+    def __init__(self, job, signals):
+        super().__init__()
+        self.job = job
+        self.signals = signals
+
+    def run(self):
+        try:
+            result = self.job(self.signals.progress.emit)
+            self.signals.finished.emit(result, "")
+        except Exception as e:
+            self.signals.finished.emit(None, str(e))
+
+class BackgroundJobs:
+    def __init__(self, max_threads=1):
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(max_threads)
+        # Keeps each job's signals alive until it has reported back.
+        self.tasks = set()
+
+    def start(self, job, on_done, on_progress=None):
+        signals = _JobSignals()
+        self.tasks.add(signals)
+        if on_progress:
+            signals.progress.connect(on_progress)
+
+        def finished(result, error):
+            self.tasks.discard(signals)
+            on_done(result, error)
+
+        signals.finished.connect(finished)
+        self.pool.start(_JobTask(job, signals))
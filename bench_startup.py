@@ -0,0 +1,52 @@
+import os
+import sys
+import time
+import shutil
+import sqlite3
+import tempfile
+import statistics
+import subprocess
+
+# Measures notifier startup, from spawning the interpreter to the first painted popup.
+# Usage: python3 bench_startup.py [runs]
+#
+# Runs against a scratch copy of the add-on folder, so benchmarking never advances the live
+# rotation, migrates the live pairs.db or leaves glyph caches and locks behind. Images are not
+# copied; the popup loads them asynchronously after its first paint.
+
+ADDON_PATH = os.path.dirname(os.path.abspath(__file__))
+SKIPPED_FILES = shutil.ignore_patterns(".git", "imagens", "thumbnails", "pairs.db*", "rotation.json",
+                                       "star_notification.lock", "*.tmp", "*.ankiaddon", "*.whl")
+
+def copy_addon(destination):
+    shutil.copytree(ADDON_PATH, destination, ignore=SKIPPED_FILES)
+    source_db = os.path.join(ADDON_PATH, "pairs.db")
+    if os.path.exists(source_db):
+        # The backup API gives a consistent snapshot even while the add-on has the store open.
+        source = sqlite3.connect(source_db)
+        target = sqlite3.connect(os.path.join(destination, "pairs.db"))
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
+
+def run_once(script_path):
+    env = dict(os.environ, NOTIFICA_SPAWN_TIME=repr(time.time()))
+    result = subprocess.run([sys.executable, script_path, "--bench"], env=env, capture_output=True, text=True, timeout=60)
+    for line in result.stdout.splitlines():
+        if line.startswith("first_paint_ms="):
+            return float(line.split("=", 1)[1])
+    raise RuntimeError(f"Notifier did not report a first paint: {result.stderr.strip()}")
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    with tempfile.TemporaryDirectory(prefix="notifica-bench-") as temp_dir:
+        addon_copy = os.path.join(temp_dir, os.path.basename(ADDON_PATH))
+        copy_addon(addon_copy)
+        script_path = os.path.join(addon_copy, "star_notification_bg.py")
+        timings = [run_once(script_path) for _ in range(runs)]
+    print(f"runs={runs} median_ms={statistics.median(timings):.1f} min_ms={min(timings):.1f} max_ms={max(timings):.1f}")
+
+if __name__ == "__main__":
+    main()
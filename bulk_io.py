@@ -0,0 +1,296 @@
+import os
+import io
+import csv
+import json
+import logging
+import zipfile
+from PyQt6.QtGui import QImageReader
+from .background_jobs import BackgroundJobs
+from .image_resolver import IMAGE_EXTENSIONS, image_name
+from .image_store import store_image
+from .pair_store import PairStore
+
+# Bulk import/export of message/image pairs. Inputs are read as a stream in batches; each
+# batch has its images copied and its rows staged in a temp table, and the staged rows go
+# into the store in one short transaction at the end. A large pack costs a single commit,
+# the add-on's own writes never wait on image copying, and a failed import leaves the
+# store untouched and removes the images it copied. Jobs run on a worker thread with their
+# own PairStore connection, since SQLite connections cannot be shared across threads.
+#
+# Formats, picked by extension:
+#   .csv    header row with a "message" column, optional "image_path" and "weight"
+#   .jsonl  one {"message", "image_path", "weight"} object per line
+#   .txt    one message per line, like the old msg.txt
+#   .zip    images plus manifest.jsonl or manifest.csv at the top level
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+MANIFEST_NAMES = ("manifest.jsonl", "manifest.csv")
+IMPORT_EXTENSIONS = (".csv", ".jsonl", ".ndjson", ".txt", ".zip")
+EXPORT_EXTENSIONS = (".csv", ".jsonl", ".zip")
+
+def read_records(stream, extension):
+    if extension == ".csv":
+        reader = csv.DictReader(stream)
+        if "message" not in (reader.fieldnames or []):
+            raise ValueError("CSV files need a 'message' column")
+        yield from reader
+    elif extension in (".jsonl", ".ndjson"):
+        for line_number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"line {line_number}: {e}")
+            if not isinstance(record, dict):
+                raise ValueError(f"line {line_number}: expected an object")
+            yield record
+    elif extension == ".txt":
+        for line in stream:
+            if line.strip():
+                yield {"message": line.strip()}
+    else:
+        raise ValueError(f"Unsupported format: {extension or 'no extension'}")
+
+def normalize_record(record):
+    message = str(record.get("message") or "").strip()
+    image_path = str(record.get("image_path") or "").strip()
+    weight = record.get("weight")
+    try:
+        weight = 1.0 if weight in (None, "") else float(weight)
+    except (TypeError, ValueError):
+        weight = 1.0
+    if not message and not image_path:
+        return None
+    return message, image_path, max(0.0, weight)
+
+def is_image_file(path):
+    return os.path.splitext(path)[1].lower() in IMAGE_EXTENSIONS and QImageReader(path).canRead()
+
+class _ImageImporter:
+    # Copies referenced images into imagens/ once each and returns the stored file name.
+    # Packs come from other people, so only image files from inside the pack are ever copied:
+    # zip members, or paths relative to the imported file that stay within its folder.
+    def __init__(self, images_dir, max_dimension, base_dir=None, archive=None):
+        self.images_dir = images_dir
+        self.max_dimension = max_dimension
+        self.base_dir = os.path.realpath(base_dir) if base_dir is not None else None
+        self.archive = archive
+        self.members = set(archive.namelist()) if archive else set()
+        self.stored = {}
+        self.existing = set(os.listdir(images_dir)) if os.path.isdir(images_dir) else set()
+        self.created = set()
+
+    def store(self, image_path):
+        if not image_path:
+            return ""
+        if image_path not in self.stored:
+            try:
+                self.stored[image_path] = self.store_new(image_path)
+            except (OSError, zipfile.BadZipFile) as e:
+                # One unreadable picture should not abort the whole pack.
+                logger.error(f"Error importing image {image_path}: {e}")
+                self.stored[image_path] = self.fallback_name(image_path)
+        return self.stored[image_path]
+
+    def store_new(self, image_path):
+        member = image_path.replace("\\", "/").lstrip("/")
+        if member in self.members:
+            if os.path.splitext(member)[1].lower() not in IMAGE_EXTENSIONS:
+                logger.warning(f"Skipping {image_path}: not an image file")
+                return ""
+            # Zip members are copied to a temp file first; their names never become paths.
+            temp_path = os.path.join(self.images_dir, f".import.{os.getpid()}{os.path.splitext(member)[1].lower()}")
+            os.makedirs(self.images_dir, exist_ok=True)
+            try:
+                with self.archive.open(member) as source, open(temp_path, "wb") as destination:
+                    for chunk in iter(lambda: source.read(1024 * 1024), b""):
+                        destination.write(chunk)
+                if not QImageReader(temp_path).canRead():
+                    logger.warning(f"Skipping {image_path}: not a readable image")
+                    return ""
+                return self.copy(temp_path)
+            finally:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+        source_path = self.source_path(image_path)
+        if source_path is not None and os.path.isfile(source_path):
+            if not is_image_file(source_path):
+                logger.warning(f"Skipping {image_path}: not a readable image")
+                return ""
+            return self.copy(source_path)
+        return self.fallback_name(image_path)
+
+    def copy(self, source_path):
+        name = os.path.basename(store_image(self.images_dir, source_path, self.max_dimension))
+        if name not in self.existing:
+            self.created.add(name)
+        return name
+
+    def remove_created(self, store):
+        # A failed import adds no rows, so the images it copied are removed again, unless a
+        # pair added in the meantime (from the settings dialog, say) already uses one of them.
+        for name in self.created:
+            try:
+                if not store.references_image(name):
+                    os.remove(os.path.join(self.images_dir, name))
+            except Exception as e:
+                logger.error(f"Error removing imported image {name}: {e}")
+        self.created.clear()
+
+    def source_path(self, image_path):
+        if self.base_dir is None:
+            return None
+        if os.path.isabs(image_path):
+            # Absolute paths name files on the machine that made the pack, or anywhere on this one.
+            logger.warning(f"Not copying {image_path}: absolute paths are not imported")
+            return None
+        path = os.path.realpath(os.path.join(self.base_dir, image_path))
+        try:
+            inside = os.path.commonpath([path, self.base_dir]) == self.base_dir
+        except ValueError:
+            # Different drives on Windows.
+            inside = False
+        if not inside:
+            logger.warning(f"Not copying {image_path}: it is outside the imported file's folder")
+            return None
+        return path
+
+    def fallback_name(self, image_path):
+        # Possibly the name of a picture already in imagens/; the resolver only ever looks there.
+        name = image_name(image_path)
+        return name if name.lower().endswith(IMAGE_EXTENSIONS) else ""
+
+def read_batches(records):
+    batch = []
+    for record in records:
+        row = normalize_record(record)
+        if row is None:
+            continue
+        batch.append(row)
+        if len(batch) == BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def import_rows(store, records, images, position, progress):
+    # The input is read BATCH_SIZE rows at a time: each batch's images are copied, then its
+    # rows are staged, so memory stays flat however large the pack is. The pairs table only
+    # changes in commit_staged() at the very end.
+    store.clear_staged()
+    done = 0
+    for batch in read_batches(records):
+        # Spread the batch's share of the input over its images, which is where the time goes.
+        start, end = done, position() * 0.95
+        rows = []
+        for index, (message, image_path, weight) in enumerate(batch, 1):
+            rows.append((message, images.store(image_path), weight))
+            if image_path:
+                progress(int(start + (end - start) * index / len(batch)))
+        store.stage_many(rows)
+        done = end
+        progress(int(done))
+    count = store.commit_staged()
+    progress(100)
+    return count
+
+def import_pairs(db_path, images_dir, source_path, max_dimension=0, progress=None):
+    progress = progress or (lambda percent: None)
+    extension = os.path.splitext(source_path)[1].lower()
+    if extension not in IMPORT_EXTENSIONS:
+        raise ValueError(f"Unsupported format: {extension or 'no extension'}")
+    store = PairStore(db_path)
+    images = None
+    try:
+        if extension == ".zip":
+            with zipfile.ZipFile(source_path) as archive:
+                manifest = next((name for name in MANIFEST_NAMES if name in archive.namelist()), None)
+                if manifest is None:
+                    raise ValueError("The zip file has no manifest.jsonl or manifest.csv")
+                total = max(1, archive.getinfo(manifest).file_size)
+                images = _ImageImporter(images_dir, max_dimension, archive=archive)
+                with archive.open(manifest) as raw:
+                    stream = io.TextIOWrapper(raw, encoding="utf-8-sig", newline="")
+                    return import_rows(store, read_records(stream, os.path.splitext(manifest)[1]), images,
+                                       lambda: raw.tell() * 100 / total, progress)
+        total = max(1, os.path.getsize(source_path))
+        images = _ImageImporter(images_dir, max_dimension, base_dir=os.path.dirname(os.path.abspath(source_path)))
+        with open(source_path, "rb") as raw:
+            stream = io.TextIOWrapper(raw, encoding="utf-8-sig", newline="")
+            return import_rows(store, read_records(stream, extension), images, lambda: raw.tell() * 100 / total, progress)
+    except Exception:
+        if images is not None:
+            images.remove_created(store)
+        raise
+    finally:
+        store.close()
+
+def export_pairs(db_path, images_dir, destination_path, progress=None):
+    progress = progress or (lambda percent: None)
+    extension = os.path.splitext(destination_path)[1].lower()
+    if extension not in EXPORT_EXTENSIONS:
+        raise ValueError(f"Unsupported format: {extension or 'no extension'}")
+    store = PairStore(db_path)
+    temp_path = f"{destination_path}.{os.getpid()}.tmp"
+    try:
+        total = max(1, store.count())
+        count = 0
+        if extension == ".zip":
+            with zipfile.ZipFile(temp_path, "w", zipfile.ZIP_DEFLATED) as archive:
+                added = set()
+                with archive.open("manifest.jsonl", "w") as raw:
+                    stream = io.TextIOWrapper(raw, encoding="utf-8", newline="\n")
+                    for message, image_path, weight in store.iter_pairs():
+                        name = image_name(image_path) if image_path else ""
+                        stream.write(json.dumps({"message": message, "image_path": name, "weight": weight},
+                                                ensure_ascii=False) + "\n")
+                        if name and name not in added and os.path.isfile(os.path.join(images_dir, name)):
+                            added.add(name)
+                        count += 1
+                        if count % BATCH_SIZE == 0:
+                            progress(int(count * 50 / total))
+                    stream.flush()
+                    stream.detach()
+                # Images go in after the manifest; a zip can only have one member open for writing.
+                for index, name in enumerate(sorted(added), 1):
+                    archive.write(os.path.join(images_dir, name), name, zipfile.ZIP_STORED)
+                    progress(50 + int(index * 50 / len(added)))
+        else:
+            with open(temp_path, "w", encoding="utf-8", newline="") as stream:
+                writer = csv.writer(stream) if extension == ".csv" else None
+                if writer:
+                    writer.writerow(["message", "image_path", "weight"])
+                for message, image_path, weight in store.iter_pairs():
+                    if writer:
+                        writer.writerow([message, image_path, weight])
+                    else:
+                        stream.write(json.dumps({"message": message, "image_path": image_path, "weight": weight},
+                                                ensure_ascii=False) + "\n")
+                    count += 1
+                    if count % BATCH_SIZE == 0:
+                        progress(int(count * 100 / total))
+        os.replace(temp_path, destination_path)
+    finally:
+        store.close()
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    progress(100)
+    return count
+
+class BulkTransfer:
+    def __init__(self, db_path, images_dir, max_dimension=0):
+        self.db_path = db_path
+        self.images_dir = images_dir
+        self.max_dimension = max_dimension
+        self.jobs = BackgroundJobs()
+
+    def import_file(self, source_path, on_done, on_progress=None):
+        self.jobs.start(lambda progress: import_pairs(self.db_path, self.images_dir, source_path, self.max_dimension,
+                                                      progress), on_done, on_progress)
+
+    def export_file(self, destination_path, on_done, on_progress=None):
+        self.jobs.start(lambda progress: export_pairs(self.db_path, self.images_dir, destination_path, progress),
+                        on_done, on_progress)
@@ -0,0 +1,100 @@
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex, QRect, QSize
+from PyQt6.QtGui import QColor, QFont, QPen, QPixmap
+from PyQt6.QtWidgets import QStyledItemDelegate, QStyle
+
+MESSAGE_WIDTH = 650
+IMAGE_SIZE = 120
+ROW_HEIGHT = 130
+ROW_SPACING = 5
+THUMBNAIL_SIZE = 100
+
+class PairListModel(QAbstractListModel):
+    def __init__(self, pairs, thumbnails, resolver, parent=None):
+        super().__init__(parent)
+        self.pairs = pairs
+        self.thumbnails = thumbnails
+        self.resolver = resolver
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.pairs)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= len(self.pairs):
+            return None
+        pair = self.pairs[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return pair.message if pair.message else "(No message)"
+        if role == Qt.ItemDataRole.DecorationRole:
+            # A null pixmap means "no image"; None means the thumbnail is still loading.
+            image_path = self.resolver.resolve(pair.image_path)
+            if not image_path:
+                return QPixmap()
+            pixmap = self.thumbnails.cached(image_path, THUMBNAIL_SIZE)
+            if pixmap is None:
+                # Only rows that are actually painted ask for their thumbnail.
+                row, stored_path = index.row(), pair.image_path
+                self.thumbnails.request(image_path, THUMBNAIL_SIZE, lambda _pixmap: self.thumbnail_ready(row, stored_path))
+            return pixmap
+        return None
+
+    def thumbnail_ready(self, row, image_path):
+        if row < len(self.pairs) and self.pairs[row].image_path == image_path:
+            self.refresh_row(row)
+
+    def refresh_row(self, row):
+        index = self.index(row)
+        self.dataChanged.emit(index, index)
+
+    def reset_pairs(self, pairs):
+        # Replace the contents in place: the handler and this model share one list.
+        self.beginResetModel()
+        self.pairs[:] = pairs
+        self.endResetModel()
+
+    def append_pair(self, pair):
+        row = len(self.pairs)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.pairs.append(pair)
+        self.endInsertRows()
+
+    def remove_rows(self, rows):
+        for row in sorted(rows, reverse=True):
+            self.beginRemoveRows(QModelIndex(), row, row)
+            self.pairs.pop(row)
+            self.endRemoveRows()
+
+class PairItemDelegate(QStyledItemDelegate):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.font = QFont("Arial", 16)
+        self.background = QColor("#e6e6e6")
+        self.selected_background = QColor("#d0d0ff")
+
+    def sizeHint(self, option, index):
+        return QSize(MESSAGE_WIDTH + IMAGE_SIZE + 10, ROW_HEIGHT + ROW_SPACING)
+
+    def paint(self, painter, option, index):
+        painter.save()
+        row_rect = option.rect.adjusted(0, 0, -1, -ROW_SPACING)
+        selected = bool(option.state & QStyle.StateFlag.State_Selected)
+        painter.fillRect(row_rect, self.selected_background if selected else self.background)
+        painter.setPen(QPen(QColor("black"), 1))
+        painter.drawRect(row_rect)
+
+        painter.setFont(self.font)
+        message_rect = QRect(row_rect.left() + 5, row_rect.top() + 5, MESSAGE_WIDTH, row_rect.height() - 10)
+        painter.drawText(message_rect, Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter | Qt.TextFlag.TextWordWrap,
+                         index.data(Qt.ItemDataRole.DisplayRole))
+
+        image_rect = QRect(message_rect.right() + 5, row_rect.top() + (row_rect.height() - IMAGE_SIZE) // 2, IMAGE_SIZE, IMAGE_SIZE)
+        pixmap = index.data(Qt.ItemDataRole.DecorationRole)
+        if pixmap is not None and not pixmap.isNull():
+            target = pixmap.size().scaled(image_rect.size(), Qt.AspectRatioMode.KeepAspectRatio)
+            if pixmap.width() <= image_rect.width() and pixmap.height() <= image_rect.height():
+                target = pixmap.size()
+            x = image_rect.left() + (image_rect.width() - target.width()) // 2
+            y = image_rect.top() + (image_rect.height() - target.height()) // 2
+            painter.drawPixmap(QRect(x, y, target.width(), target.height()), pixmap)
+        elif pixmap is not None:
+            painter.drawText(image_rect, Qt.AlignmentFlag.AlignCenter, "(No image)")
+        painter.restore()
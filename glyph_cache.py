@@ -0,0 +1,113 @@
+import os
+import math
+from collections import OrderedDict
+from PyQt6.QtCore import QPointF, Qt
+from PyQt6.QtGui import QBrush, QColor, QFont, QFontMetricsF, QImage, QPainter, QPen, QPixmap, QPolygonF
+try:
+    from .thumbnails import save_image_atomic
+except ImportError:
+    # The notifier runs these modules from the add-on folder, outside the package.
+    from thumbnails import save_image_atomic
+
+# Star glyphs used by the tray, popup and window icons. Each variant is rendered once per
+# pixel size into a PNG under the cache directory, so later runs of either process only
+# load a file. Bump GLYPH_VERSION whenever the drawing below changes.
+
+GLYPH_VERSION = 1
+
+# Unit star, point up: five outer points interleaved with inner points at 0.4 of the radius.
+STAR_POINTS = tuple(
+    (radius * math.cos(angle), radius * math.sin(angle))
+    for i in range(10)
+    for radius, angle in [(1.0 if i % 2 == 0 else 0.4, i * math.pi / 5 - math.pi / 2)]
+)
+
+def star_polygon(size):
+    half = size / 2
+    return QPolygonF([QPointF(half + x * half, half + y * half) for x, y in STAR_POINTS])
+
+def render_star(size):
+    image = QImage(size, size, QImage.Format.Format_ARGB32_Premultiplied)
+    image.fill(Qt.GlobalColor.transparent)
+    painter = QPainter(image)
+    painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+    painter.setPen(QPen(QColor(255, 0, 0)))
+    painter.setBrush(QBrush(QColor(255, 0, 0, 180)))
+    painter.drawPolygon(star_polygon(size))
+    painter.end()
+    return image
+
+def render_badge(text, size):
+    image = QImage(size, size, QImage.Format.Format_ARGB32_Premultiplied)
+    image.fill(Qt.GlobalColor.transparent)
+    painter = QPainter(image)
+    painter.setRenderHints(QPainter.RenderHint.Antialiasing | QPainter.RenderHint.TextAntialiasing)
+    painter.setPen(Qt.PenStyle.NoPen)
+    painter.setBrush(QBrush(QColor(255, 0, 0)))
+    painter.drawPolygon(star_polygon(size))
+    # Same layout as the old 100x100 SVG badge: shorter counts get larger type.
+    painter.scale(size / 100, size / 100)
+    x, font_size = {1: (50, 45), 2: (45, 35), 3: (40, 25)}.get(len(text), (50, 20))
+    font = QFont("Arial")
+    font.setPixelSize(font_size)
+    font.setBold(True)
+    painter.setFont(font)
+    painter.setPen(QColor(255, 255, 255))
+    painter.drawText(QPointF(x - QFontMetricsF(font).horizontalAdvance(text) / 2, 65), text)
+    painter.end()
+    return image
+
+class GlyphCache:
+    def __init__(self, cache_dir, max_entries=64):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.pixmaps = OrderedDict()
+        self.hits = 0
+        self.loads = 0
+        self.renders = 0
+
+    def glyph_path(self, name, size):
+        safe_name = "".join(c if c.isalnum() else "_" for c in name)
+        return os.path.join(self.cache_dir, f"{safe_name}_{size}_v{GLYPH_VERSION}.png")
+
+    def star(self, size, scale=1.0):
+        return self.get("star", size, scale, render_star)
+
+    def badge(self, text, size, scale=1.0):
+        return self.get(f"badge_{text}", size, scale, lambda pixels: render_badge(text, pixels))
+
+    def get(self, name, size, scale, render):
+        # Glyphs are drawn at device resolution so nothing upscales a small bitmap.
+        pixels = max(size, round(size * scale))
+        key = (name, pixels)
+        pixmap = self.pixmaps.get(key)
+        if pixmap is not None:
+            self.pixmaps.move_to_end(key)
+            self.hits += 1
+        else:
+            pixmap = self.load(name, pixels, render)
+            self.pixmaps[key] = pixmap
+            if len(self.pixmaps) > self.max_entries:
+                self.pixmaps.popitem(last=False)
+        # Share the cached pixmap's data but give the caller its own device pixel ratio.
+        result = QPixmap(pixmap)
+        result.setDevicePixelRatio(pixels / size)
+        return result
+
+    def load(self, name, pixels, render):
+        path = self.glyph_path(name, pixels)
+        image = QImage(path) if os.path.exists(path) else QImage()
+        if not image.isNull():
+            self.loads += 1
+            return QPixmap.fromImage(image)
+        self.renders += 1
+        image = render(pixels)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            save_image_atomic(image, path)
+        except OSError as e:
+            print(f"Error saving glyph {path}: {e}")
+        return QPixmap.fromImage(image)
+
+    def stats(self):
+        return f"{self.hits} hits, {self.loads} loaded from disk, {self.renders} rendered, {len(self.pixmaps)} entries"
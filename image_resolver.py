@@ -0,0 +1,48 @@
+import os
+from PyQt6.QtCore import QFileSystemWatcher, QTimer
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.bmp')
+
+def image_name(image_path):
+    # Stored paths may still come from another OS, so split on both separators.
+    return image_path.replace("\\", "/").rsplit("/", 1)[-1]
+
+class ImageResolver:
+    def __init__(self, images_dir):
+        self.images_dir = images_dir
+        self.index = {}
+        self.rebuilds = 0
+        os.makedirs(images_dir, exist_ok=True)
+        # Every stored image is a temp file plus a rename, so a bulk import fires a burst of
+        # change signals; they are coalesced into one rescan once the directory settles.
+        self.rebuild_timer = QTimer()
+        self.rebuild_timer.setSingleShot(True)
+        self.rebuild_timer.setInterval(250)
+        self.rebuild_timer.timeout.connect(self.rebuild)
+        self.watcher = QFileSystemWatcher([images_dir])
+        self.watcher.directoryChanged.connect(lambda path: self.rebuild_timer.start())
+        self.rebuild()
+
+    def rebuild(self, *args):
+        self.rebuild_timer.stop()
+        index = {}
+        try:
+            with os.scandir(self.images_dir) as entries:
+                for entry in entries:
+                    if entry.name.lower().endswith(IMAGE_EXTENSIONS) and entry.is_file():
+                        index[entry.name.lower()] = entry.path
+        except OSError as e:
+            print(f"Error indexing {self.images_dir}: {e}")
+        self.index = index
+        self.rebuilds += 1
+
+    def add(self, path):
+        self.index[image_name(path).lower()] = path
+
+    def resolve(self, image_path):
+        if not image_path:
+            return None
+        if self.rebuild_timer.isActive():
+            # A change is still pending; rescan now rather than answer from a stale index.
+            self.rebuild()
+        return self.index.get(image_name(image_path).lower())
@@ -0,0 +1,75 @@
+import os
+import hashlib
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QImageReader
+from .background_jobs import BackgroundJobs
+
+CHUNK_SIZE = 1024 * 1024
+
+def hash_file(path, progress=None):
+    digest = hashlib.sha256()
+    done = 0
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+            done += len(chunk)
+            if progress:
+                progress(done)
+    return digest.hexdigest()
+
+def copy_file(source_path, destination_path, progress=None):
+    done = 0
+    with open(source_path, "rb") as source, open(destination_path, "wb") as destination:
+        for chunk in iter(lambda: source.read(CHUNK_SIZE), b""):
+            destination.write(chunk)
+            done += len(chunk)
+            if progress:
+                progress(done)
+
+def downscaled_image(source_path, max_dimension):
+    if max_dimension <= 0:
+        return None
+    reader = QImageReader(source_path)
+    reader.setAutoTransform(True)
+    size = reader.size()
+    # Animated images would lose their frames, so only still images are shrunk.
+    if not size.isValid() or max(size.width(), size.height()) <= max_dimension or reader.supportsAnimation():
+        return None
+    reader.setScaledSize(size.scaled(max_dimension, max_dimension, Qt.AspectRatioMode.KeepAspectRatio))
+    image = reader.read()
+    return None if image.isNull() else image
+
+def store_image(images_dir, source_path, max_dimension=0, progress=None):
+    # Files are named after the hash of their original bytes, so importing the same picture
+    # twice reuses one file and two different "photo.png" files can no longer clash.
+    total = max(1, os.path.getsize(source_path))
+    report = (lambda fraction: progress(int(fraction * 100))) if progress else (lambda fraction: None)
+    digest = hash_file(source_path, lambda done: report(done / total / 2))
+    extension = os.path.splitext(source_path)[1].lower() or ".png"
+    destination_path = os.path.join(images_dir, digest[:16] + extension)
+    if os.path.exists(destination_path):
+        report(1)
+        return destination_path
+
+    os.makedirs(images_dir, exist_ok=True)
+    temp_path = f"{destination_path}.{os.getpid()}.tmp"
+    try:
+        image = downscaled_image(source_path, max_dimension)
+        if image is None or not image.save(temp_path, extension.lstrip(".").upper()):
+            copy_file(source_path, temp_path, lambda done: report(0.5 + done / total / 2))
+        os.replace(temp_path, destination_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    report(1)
+    return destination_path
+
+class ImageStore:
+    def __init__(self, images_dir, max_dimension=0):
+        self.images_dir = images_dir
+        self.max_dimension = max_dimension
+        self.jobs = BackgroundJobs()
+
+    def import_image(self, source_path, on_done, on_progress=None):
+        self.jobs.start(lambda progress: store_image(self.images_dir, source_path, self.max_dimension, progress),
+                        on_done, on_progress)
@@ -0,0 +1,169 @@
+import os
+import json
+import sqlite3
+
+SCHEMA_VERSION = 4
+NEXT_SLOT = "coalesce((select max(slot) from pairs), -1) + 1"
+
+class PairStore:
+    def __init__(self, path):
+        self.path = path
+        self.db = sqlite3.connect(path, timeout=5)
+        # WAL keeps every insert/update/delete a small append, and a crash mid-write can
+        # only lose the transaction in flight, never leave the table half-written.
+        self.db.execute("pragma journal_mode = wal")
+        self.db.execute("pragma synchronous = normal")
+        # New stores start on the current schema; migrate_legacy() upgrades stores from older versions.
+        self.db.execute("create table if not exists pairs ("
+                        "id integer primary key, "
+                        "message text not null default '', "
+                        "image_path text not null default '', "
+                        "weight real not null default 1, "
+                        "slot integer)")
+        if "slot" in self.columns():
+            self.db.execute("create unique index if not exists pairs_slot on pairs (slot)")
+        self.db.commit()
+
+    def close(self):
+        self.db.close()
+
+    def columns(self):
+        return [row[1] for row in self.db.execute("pragma table_info(pairs)").fetchall()]
+
+    def schema_version(self):
+        return self.db.execute("pragma user_version").fetchone()[0]
+
+    def migrate_legacy(self, json_path, msg_path, images_dir):
+        if self.schema_version() >= SCHEMA_VERSION:
+            return
+        with self.db:
+            # Both processes may open the store first; the write lock makes one of them do the import.
+            self.db.execute("begin immediate")
+            version = self.schema_version()
+            if version < 1:
+                self.import_legacy(json_path, msg_path)
+            if version < 2:
+                self.relativize_image_paths(images_dir)
+            if version < 3:
+                self.add_weights()
+            if version < 4:
+                self.add_slots()
+            self.db.execute(f"pragma user_version = {SCHEMA_VERSION}")
+
+    def import_legacy(self, json_path, msg_path):
+        rows = []
+        if os.path.exists(json_path):
+            try:
+                with open(json_path, 'r', encoding='utf-8') as file:
+                    rows = [(pair.get("message", ""), pair.get("image_path", "")) for pair in json.load(file)]
+            except Exception as e:
+                print(f"Error migrating message-image pairs: {e}")
+        if not rows and os.path.exists(msg_path):
+            try:
+                with open(msg_path, 'r', encoding='utf-8') as file:
+                    rows = [(line.strip(), "") for line in file if line.strip()]
+            except Exception as e:
+                print(f"Error migrating messages from msg.txt: {e}")
+        self.db.executemany("insert into pairs (message, image_path) values (?, ?)", rows)
+
+    def relativize_image_paths(self, images_dir):
+        # Older versions stored absolute paths from the machine that added the image; only the
+        # file name inside imagens/ is portable.
+        updates = []
+        for pair_id, image_path in self.db.execute("select id, image_path from pairs where image_path != ''").fetchall():
+            name = image_path.replace("\\", "/").rsplit("/", 1)[-1]
+            if name != image_path and os.path.exists(os.path.join(images_dir, name)):
+                updates.append((name, pair_id))
+        self.db.executemany("update pairs set image_path = ? where id = ?", updates)
+
+    def add_weights(self):
+        # Relative rotation weight per message; 1 for everything that existed before.
+        if "weight" not in self.columns():
+            self.db.execute("alter table pairs add column weight real not null default 1")
+
+    def add_slots(self):
+        # Slots number the rows 0..n-1 with no gaps, so a reader that only knows the count
+        # can fetch any row by position without loading the table.
+        if "slot" not in self.columns():
+            self.db.execute("alter table pairs add column slot integer")
+        ids = [row[0] for row in self.db.execute("select id from pairs order by id").fetchall()]
+        self.db.execute("update pairs set slot = null")
+        self.db.executemany("update pairs set slot = ? where id = ?", enumerate(ids))
+        self.db.execute("create unique index if not exists pairs_slot on pairs (slot)")
+
+    def data_version(self):
+        # Changes whenever another connection commits, so readers can skip unchanged reloads.
+        return self.db.execute("pragma data_version").fetchone()[0]
+
+    def all(self):
+        return self.db.execute("select id, message, image_path, weight from pairs order by id").fetchall()
+
+    def count(self):
+        return self.db.execute("select count() from pairs").fetchone()[0]
+
+    def get_by_slot(self, slot):
+        return self.db.execute("select id, message, image_path, weight from pairs where slot = ?", (slot,)).fetchone()
+
+    def has_custom_weights(self):
+        return self.db.execute("select exists (select 1 from pairs where weight != 1)").fetchone()[0] == 1
+
+    def weights(self):
+        return [row[0] for row in self.db.execute("select weight from pairs order by slot").fetchall()]
+
+    def insert(self, message, image_path):
+        with self.db:
+            return self.db.execute(f"insert into pairs (message, image_path, slot) values (?, ?, {NEXT_SLOT})",
+                                   (message, image_path)).lastrowid
+
+    def references_image(self, image_path):
+        return self.db.execute("select exists (select 1 from pairs where image_path = ?)", (image_path,)).fetchone()[0] == 1
+
+    def clear_staged(self):
+        # Bulk imports stage rows in a temp table private to this connection; filling it takes
+        # no lock on the store, however long the import runs.
+        self.db.execute("drop table if exists temp.staged_pairs")
+        self.db.execute("create temp table staged_pairs ("
+                        "position integer primary key, message text, image_path text, weight real)")
+        self.db.commit()
+
+    def stage_many(self, rows):
+        self.db.executemany("insert into staged_pairs (message, image_path, weight) values (?, ?, ?)", rows)
+        self.db.commit()
+
+    def commit_staged(self):
+        # Moves every staged row over in one short transaction, with slots continuing from the end.
+        with self.db:
+            self.db.execute("begin immediate")
+            next_slot = self.db.execute(f"select {NEXT_SLOT}").fetchone()[0]
+            count = self.db.execute("insert into pairs (message, image_path, weight, slot) "
+                                    "select message, image_path, weight, ? + position - 1 "
+                                    "from staged_pairs order by position", (next_slot,)).rowcount
+            self.db.execute("delete from staged_pairs")
+        return count
+
+    def iter_pairs(self, batch_size=500):
+        cursor = self.db.execute("select message, image_path, weight from pairs order by id")
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            yield from rows
+
+    def update(self, pair_id, **fields):
+        columns = [column for column in ("message", "image_path", "weight") if column in fields]
+        if not columns:
+            return
+        with self.db:
+            self.db.execute(f"update pairs set {', '.join(f'{column} = ?' for column in columns)} where id = ?",
+                            [fields[column] for column in columns] + [pair_id])
+
+    def delete(self, pair_ids):
+        with self.db:
+            for pair_id in pair_ids:
+                row = self.db.execute("select slot from pairs where id = ?", (pair_id,)).fetchone()
+                if row is None:
+                    continue
+                self.db.execute("delete from pairs where id = ?", (pair_id,))
+                # Move the last row into the freed slot to keep the numbering dense.
+                self.db.execute("update pairs set slot = ?1 where slot = (select max(slot) from pairs) and slot > ?1",
+                                (row[0],))
@@ -0,0 +1,102 @@
+import random
+
+# Picks which message the notifier shows next. With uniform weights every message is shown
+# once per round (a shuffle bag) in an order given by a seeded permutation, so a round is
+# just {seed, pos, n} and survives restarts without storing the order itself. With custom
+# weights messages are drawn independently from an alias table instead. Both pick in O(1).
+
+ROUNDS = 4
+
+class FeistelPermutation:
+    # A small balanced Feistel network over the smallest even-bit domain covering n;
+    # out-of-range results are walked back into range, which takes a few steps at most.
+    def __init__(self, n, seed):
+        self.n = n
+        bits = max(2, (max(n - 1, 1)).bit_length())
+        bits += bits % 2
+        self.half_bits = bits // 2
+        self.mask = (1 << self.half_bits) - 1
+        rng = random.Random(seed)
+        self.keys = [rng.getrandbits(32) for _ in range(ROUNDS)]
+
+    def round(self, value, key):
+        value = (value * 0x9E3779B1 + key) & 0xFFFFFFFF
+        value ^= value >> 15
+        value = (value * 0x85EBCA77) & 0xFFFFFFFF
+        return (value ^ (value >> 13)) & self.mask
+
+    def encrypt(self, value):
+        left, right = value >> self.half_bits, value & self.mask
+        for key in self.keys:
+            left, right = right, left ^ self.round(right, key)
+        return (left << self.half_bits) | right
+
+    def __getitem__(self, position):
+        value = self.encrypt(position)
+        while value >= self.n:
+            value = self.encrypt(value)
+        return value
+
+class AliasTable:
+    # Vose's alias method: O(n) to build, O(1) per weighted draw.
+    def __init__(self, weights, rng):
+        self.rng = rng
+        n = len(weights)
+        total = sum(weights)
+        scaled = [weight * n / total for weight in weights]
+        self.probability = [1.0] * n
+        self.alias = list(range(n))
+        small = [i for i, value in enumerate(scaled) if value < 1.0]
+        large = [i for i, value in enumerate(scaled) if value >= 1.0]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self.probability[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] -= 1.0 - scaled[less]
+            (small if scaled[more] < 1.0 else large).append(more)
+
+    def draw(self):
+        column = self.rng.randrange(len(self.probability))
+        return column if self.rng.random() < self.probability[column] else self.alias[column]
+
+class Rotation:
+    def __init__(self, n, weights=None, state=None):
+        # Only the count is needed for uniform weights; weights are read only when some differ.
+        self.n = n
+        self.rng = random.Random()
+        self.last = None
+        self.alias = None
+        if weights and len(weights) == n and any(weight != weights[0] for weight in weights) and sum(weights) > 0:
+            self.alias = AliasTable(weights, self.rng)
+        state = state or {}
+        if state.get("n") == self.n and isinstance(state.get("seed"), int) and 0 <= state.get("pos", -1) <= self.n:
+            self.seed, self.pos = state["seed"], state["pos"]
+            self.permutation = FeistelPermutation(self.n, self.seed)
+            self.last = state.get("last")
+        else:
+            self.new_round()
+
+    def new_round(self):
+        self.seed = self.rng.getrandbits(32)
+        self.pos = 0
+        self.permutation = FeistelPermutation(self.n, self.seed)
+
+    def state(self):
+        return {"seed": self.seed, "pos": self.pos, "n": self.n, "last": self.last}
+
+    def next(self):
+        if not self.n:
+            return None
+        if self.alias is not None:
+            # Draws follow the weights exactly, so a heavy message may come up twice in a row.
+            index = self.alias.draw()
+        else:
+            if self.pos >= self.n:
+                self.new_round()
+                # Do not let a new round open with the message that closed the previous one.
+                while self.n > 1 and self.permutation[0] == self.last:
+                    self.new_round()
+            index = self.permutation[self.pos]
+            self.pos += 1
+        self.last = index
+        return index
@@ -0,0 +1,116 @@
+import sys
+import time
+import ctypes
+
+# Decides when the notifier should next pop up. Popups are skipped during quiet hours and
+# while the user is away or the screen is locked, and the cadence backs off exponentially
+# while popups keep being ignored. The caller sleeps on a single-shot timer for next_delay().
+
+def parse_clock(value):
+    try:
+        hours, minutes = str(value).split(":")
+        return (int(hours) % 24) * 60 + int(minutes) % 60
+    except ValueError:
+        return None
+
+def minutes_since_midnight(now):
+    local = time.localtime(now)
+    return local.tm_hour * 60 + local.tm_min + local.tm_sec / 60
+
+if sys.platform == "win32":
+    class _LastInputInfo(ctypes.Structure):
+        _fields_ = [("cbSize", ctypes.c_uint), ("dwTime", ctypes.c_uint)]
+
+    def idle_seconds():
+        info = _LastInputInfo()
+        info.cbSize = ctypes.sizeof(info)
+        if not ctypes.windll.user32.GetLastInputInfo(ctypes.byref(info)):
+            return None
+        return ((ctypes.windll.kernel32.GetTickCount() - info.dwTime) & 0xFFFFFFFF) / 1000
+
+    def screen_locked():
+        # The input desktop cannot be opened while the workstation is locked.
+        desktop = ctypes.windll.user32.OpenInputDesktop(0, False, 0x0100)
+        if not desktop:
+            return True
+        ctypes.windll.user32.CloseDesktop(desktop)
+        return False
+elif sys.platform == "darwin":
+    try:
+        _quartz = ctypes.cdll.LoadLibrary("/System/Library/Frameworks/ApplicationServices.framework/ApplicationServices")
+        _quartz.CGEventSourceSecondsSinceLastEventType.restype = ctypes.c_double
+        _quartz.CGEventSourceSecondsSinceLastEventType.argtypes = [ctypes.c_int, ctypes.c_uint32]
+    except OSError:
+        _quartz = None
+
+    def idle_seconds():
+        if _quartz is None:
+            return None
+        # kCGEventSourceStateHIDSystemState, kCGAnyInputEventType
+        return _quartz.CGEventSourceSecondsSinceLastEventType(1, 0xFFFFFFFF)
+
+    def screen_locked():
+        return False
+else:
+    def idle_seconds():
+        return None
+
+    def screen_locked():
+        return False
+
+class SchedulePolicy:
+    def __init__(self):
+        self.interval = 300
+        self.quiet_start = None
+        self.quiet_end = None
+        self.idle_threshold = 600
+        self.max_backoff_factor = 8
+        self.ignored_streak = 0
+        self.pending_popup = None
+
+    def configure(self, settings):
+        self.interval = max(1, settings["notification_interval"] * 60)
+        self.quiet_start = parse_clock(settings.get("quiet_hours_start", ""))
+        self.quiet_end = parse_clock(settings.get("quiet_hours_end", ""))
+        self.idle_threshold = max(0, settings.get("idle_threshold_minutes", 10) * 60)
+        self.max_backoff_factor = max(1, settings.get("max_backoff_factor", 8))
+
+    def seconds_until_quiet_end(self, now):
+        if self.quiet_start is None or self.quiet_end is None or self.quiet_start == self.quiet_end:
+            return 0
+        minute = minutes_since_midnight(now)
+        if self.quiet_start < self.quiet_end:
+            quiet = self.quiet_start <= minute < self.quiet_end
+        else:
+            quiet = minute >= self.quiet_start or minute < self.quiet_end
+        if not quiet:
+            return 0
+        return ((self.quiet_end - minute) % (24 * 60)) * 60
+
+    def suppression(self, now=None):
+        now = time.time() if now is None else now
+        quiet_left = self.seconds_until_quiet_end(now)
+        if quiet_left:
+            return "quiet hours", quiet_left
+        if screen_locked():
+            return "screen locked", self.interval
+        idle = idle_seconds()
+        if self.idle_threshold and idle is not None and idle >= self.idle_threshold:
+            return "user idle", self.interval
+        return None, 0
+
+    def backoff_factor(self):
+        return min(2 ** self.ignored_streak, self.max_backoff_factor)
+
+    def next_delay(self):
+        return self.interval * self.backoff_factor()
+
+    def popup_shown(self, due_count):
+        # A popup counts as ignored if by the next one nothing was studied and nobody reacted to it.
+        if self.pending_popup is not None:
+            self.ignored_streak = self.ignored_streak + 1 if due_count >= self.pending_popup else 0
+        self.pending_popup = due_count
+
+    def engaged(self):
+        self.ignored_streak = 0
+        self.pending_popup = None
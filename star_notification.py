@@ -0,0 +1,491 @@
+import os
+import json
+import time
+from collections import deque
+from PyQt6.QtWidgets import QApplication, QWidget, QLabel, QMenu, QSystemTrayIcon, QHBoxLayout
+from PyQt6.QtCore import QTimer, Qt, QLockFile, QFileSystemWatcher, QPropertyAnimation
+from PyQt6.QtGui import QPixmap, QIcon
+from PyQt6.QtNetwork import QLocalServer
+from glyph_cache import GlyphCache
+from image_resolver import ImageResolver
+from thumbnails import ThumbnailService
+from pair_store import PairStore
+from rotation import Rotation
+from schedule_policy import SchedulePolicy
+from state_store import IPC_SERVER_NAME, read_json, write_json
+
+ADDON_PATH = os.path.dirname(os.path.abspath(__file__))
+CONFIG_PATH = os.path.join(ADDON_PATH, "star_config.json")
+SETTINGS_PATH = os.path.join(ADDON_PATH, "settings.json")
+PAIRS_PATH = os.path.join(ADDON_PATH, "message_image_pairs.json")
+PAIRS_DB_PATH = os.path.join(ADDON_PATH, "pairs.db")
+IMAGES_DIR = os.path.join(ADDON_PATH, "imagens")
+CARD_COUNT_PATH = os.path.join(ADDON_PATH, "card_count.json")
+THUMBNAILS_DIR = os.path.join(ADDON_PATH, "thumbnails")
+GLYPHS_DIR = os.path.join(ADDON_PATH, "glyphs")
+ROTATION_PATH = os.path.join(ADDON_PATH, "rotation.json")
+LOCK_PATH = os.path.join(ADDON_PATH, "star_notification.lock")
+WATCHED_FILES = {SETTINGS_PATH: "settings", PAIRS_DB_PATH: "pairs", PAIRS_DB_PATH + "-wal": "pairs"}
+
+class StarNotification(QWidget):
+    def __init__(self, bench=False):
+        super().__init__()
+        self.bench = bench
+        self.setWindowFlags(Qt.WindowType.WindowStaysOnTopHint | Qt.WindowType.FramelessWindowHint | Qt.WindowType.Tool)
+        self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground, False)
+        self.tray_icon = None
+        self.frame_times = []
+        self.last_frame_at = None
+        self.card_info = None
+        self.state_version = None
+        self.settings_version = None
+        self.pair_store = None
+        self.pairs_version = None
+        self.current_image_path = None
+        self.prefetch = deque()
+        self.show_requested_at = None
+        self.show_prefetched = False
+        self.shown_due_count = 0
+        self.policy = SchedulePolicy()
+        self.thumbnails = ThumbnailService(THUMBNAILS_DIR)
+        self.glyphs = GlyphCache(GLYPHS_DIR)
+        self.image_resolver = ImageResolver(IMAGES_DIR)
+        self.setupUI()
+        self.setup_tray()
+        self.load_settings()
+        self.load_pairs()
+        self.setup_file_watcher()
+        self.show_timer = QTimer(self)
+        self.show_timer.setSingleShot(True)
+        self.show_timer.timeout.connect(self.start_blinking)
+        # The window stays mapped while blinking; only its opacity is animated, which the
+        # compositor handles without a window-manager round trip or a re-layout.
+        self.blink_animation = QPropertyAnimation(self, b"windowOpacity", self)
+        self.blink_animation.setDuration(2000)
+        for step, opacity in enumerate((1.0, 0.15, 1.0, 0.15, 1.0)):
+            self.blink_animation.setKeyValueAt(step / 4, opacity)
+        self.blink_animation.valueChanged.connect(self.record_blink_frame)
+        self.blink_animation.finished.connect(self.hide_notification)
+        self.cycle_timer = QTimer(self)
+        self.cycle_timer.setSingleShot(True)
+        self.cycle_timer.timeout.connect(self.on_cycle_timer)
+        self.check_timer = QTimer(self)
+        self.check_timer.timeout.connect(self.check_status)
+        if self.bench:
+            self.card_info = {"count": 1, "deck": "all"}
+            self.show_notification()
+            return
+        # star_config.json is only polled when the push channel cannot be opened.
+        if not self.setup_ipc():
+            self.check_timer.start(1000)
+        if not read_json(CONFIG_PATH, {}).get("in_review", False):
+            self.start_notification_cycle()
+
+    def setup_ipc(self):
+        self.server = QLocalServer(self)
+        if not self.server.listen(IPC_SERVER_NAME):
+            # A stale socket left behind by a crashed notifier blocks listen() on Unix.
+            QLocalServer.removeServer(IPC_SERVER_NAME)
+            if not self.server.listen(IPC_SERVER_NAME):
+                print(f"IPC unavailable, falling back to polling: {self.server.errorString()}")
+                return False
+        self.server.newConnection.connect(self.accept_ipc_connection)
+        return True
+
+    def accept_ipc_connection(self):
+        while self.server.hasPendingConnections():
+            connection = self.server.nextPendingConnection()
+            connection.readyRead.connect(lambda c=connection: self.read_ipc_messages(c))
+            connection.disconnected.connect(lambda c=connection: self.read_ipc_messages(c))
+            connection.disconnected.connect(connection.deleteLater)
+
+    def read_ipc_messages(self, connection):
+        while connection.canReadLine():
+            line = bytes(connection.readLine()).decode("utf-8").strip()
+            try:
+                message = json.loads(line)
+            except ValueError:
+                print(f"Ignoring malformed IPC message: {line!r}")
+                continue
+            self.handle_message(message)
+
+    def handle_message(self, message):
+        command = message.get("cmd")
+        if command == "state":
+            self.apply_state(message)
+        elif command == "count":
+            self.card_info = message
+        elif command == "reload_settings":
+            self.reload_settings()
+        elif command == "reload_pairs":
+            self.reload_pairs()
+        elif command == "show":
+            self.request_popup()
+
+    def setupUI(self):
+        self.setFixedSize(400, 150)
+        self.setStyleSheet("background-color: transparent;")
+        self.layout = QHBoxLayout(self)
+        self.layout.setContentsMargins(0, 0, 0, 0)
+        self.layout.setSpacing(0)
+        
+        self.content_widget = QWidget(self)
+        self.content_widget.setFixedSize(400, 150)
+        self.content_widget.setStyleSheet("background-color: white; border: 5px solid red;")
+        self.content_layout = QHBoxLayout(self.content_widget)
+        self.content_layout.setContentsMargins(5, 5, 5, 5)
+        self.content_layout.setSpacing(5)
+        
+        self.star_pixmap = self.glyphs.star(30, self.devicePixelRatioF())
+        self.star_label = QLabel(self.content_widget)
+        self.star_label.setPixmap(self.star_pixmap)
+        self.star_label.setStyleSheet("border: none; background-color: transparent;")
+        self.content_layout.addWidget(self.star_label)
+        
+        self.image_label = QLabel(self.content_widget)
+        self.image_label.setFixedSize(100, 100)
+        self.image_label.setStyleSheet("border: none; background-color: transparent;")
+        self.content_layout.addWidget(self.image_label)
+        
+        self.text_label = QLabel(self.content_widget)
+        self.text_label.setWordWrap(True)
+        self.text_label.setStyleSheet("color: black; font: bold 12px Arial; border: none; background-color: transparent;")
+        self.content_layout.addWidget(self.text_label)
+        
+        self.layout.addWidget(self.content_widget)
+        self.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.customContextMenuRequested.connect(self.show_context_menu)
+        self.position_near_clock()
+
+    def start_notification_cycle(self):
+        self.on_cycle_timer()
+
+    def schedule_next_popup(self, delay_seconds):
+        self.cycle_timer.start(int(delay_seconds * 1000))
+
+    def on_cycle_timer(self):
+        reason, wait_seconds = self.policy.suppression()
+        if reason:
+            # Nothing runs while suppressed except this one single-shot timer.
+            print(f"Popup suppressed ({reason}), next check in {wait_seconds / 60:.1f} min")
+            self.stop_popup()
+            self.schedule_next_popup(wait_seconds)
+            return
+        if self.show_notification():
+            self.policy.popup_shown(self.shown_due_count)
+        delay_seconds = self.policy.next_delay()
+        if self.policy.backoff_factor() > 1:
+            print(f"Popups ignored {self.policy.ignored_streak} times, next one in {delay_seconds / 60:.1f} min")
+        self.schedule_next_popup(delay_seconds)
+
+    def request_popup(self):
+        # "show" only comes from the add-on's Show Notification action. Like a tray click, a
+        # popup the user asked for bypasses the policy and counts as engagement, not as ignored.
+        self.policy.engaged()
+        self.show_notification()
+
+    def stop_popup(self):
+        self.blink_animation.stop()
+        self.setWindowOpacity(1.0)
+        self.show_timer.stop()
+        if self.isVisible():
+            self.hide()
+
+    def show_notification(self):
+        self.show_requested_at = time.perf_counter()
+        if not self.update_content():
+            self.show_requested_at = None
+            return False
+        self.show()
+        self.raise_()
+        self.blink_animation.stop()
+        self.setWindowOpacity(1.0)
+        self.show_timer.start(5000)
+        return True
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self.show_requested_at is not None:
+            elapsed_ms = (time.perf_counter() - self.show_requested_at) * 1000
+            self.show_requested_at = None
+            print(f"Notification painted {elapsed_ms:.1f} ms after show request (prefetched image: {self.show_prefetched})")
+        if self.bench:
+            self.bench = False
+            spawn_time = float(os.environ.get("NOTIFICA_SPAWN_TIME", "0") or 0)
+            if spawn_time:
+                print(f"first_paint_ms={(time.time() - spawn_time) * 1000:.1f}", flush=True)
+            QTimer.singleShot(0, QApplication.quit)
+
+    def start_blinking(self):
+        self.frame_times = []
+        self.last_frame_at = time.perf_counter()
+        self.blink_animation.start()
+
+    def record_blink_frame(self, value):
+        now = time.perf_counter()
+        self.frame_times.append((now - self.last_frame_at) * 1000)
+        self.last_frame_at = now
+
+    def log_blink_frames(self):
+        if not self.frame_times:
+            return
+        frame_times = sorted(self.frame_times)
+        slow = sum(1 for frame_time in frame_times if frame_time > 33.4)
+        print(f"Blink animation: {len(frame_times)} frames, median {frame_times[len(frame_times) // 2]:.1f} ms, "
+              f"max {frame_times[-1]:.1f} ms, {slow} over 33 ms")
+        self.frame_times = []
+
+    def hide_notification(self):
+        self.log_blink_frames()
+        self.setWindowOpacity(1.0)
+        self.hide()
+        self.tray_icon.show()
+
+    def setup_file_watcher(self):
+        # Settings and content edits are picked up from disk even without an IPC message.
+        # The directory is watched as well because atomic replaces drop files from the watch list.
+        self.pending_reloads = set()
+        self.reload_timer = QTimer(self)
+        self.reload_timer.setSingleShot(True)
+        self.reload_timer.setInterval(50)
+        self.reload_timer.timeout.connect(self.apply_pending_reloads)
+        self.file_watcher = QFileSystemWatcher(self)
+        self.file_watcher.addPath(ADDON_PATH)
+        self.watch_files()
+        self.file_watcher.fileChanged.connect(self.on_file_changed)
+        self.file_watcher.directoryChanged.connect(self.on_directory_changed)
+
+    def watch_files(self):
+        missing = [path for path in WATCHED_FILES if path not in self.file_watcher.files() and os.path.exists(path)]
+        if missing:
+            self.file_watcher.addPaths(missing)
+        return missing
+
+    def on_file_changed(self, path):
+        self.schedule_reload(WATCHED_FILES.get(path))
+        self.watch_files()
+
+    def on_directory_changed(self, path):
+        for added in self.watch_files():
+            self.schedule_reload(WATCHED_FILES[added])
+
+    def schedule_reload(self, kind):
+        if kind:
+            self.pending_reloads.add(kind)
+            self.reload_timer.start()
+
+    def apply_pending_reloads(self):
+        pending, self.pending_reloads = self.pending_reloads, set()
+        if "settings" in pending:
+            self.reload_settings()
+        if "pairs" in pending:
+            self.reload_pairs()
+
+    def reload_settings(self):
+        record = read_json(SETTINGS_PATH, {})
+        if record.get("version") is not None and record.get("version") == self.settings_version:
+            return
+        self.load_settings(record)
+        if self.cycle_timer.isActive():
+            self.schedule_next_popup(self.policy.next_delay())
+
+    def reload_pairs(self):
+        try:
+            if self.pair_store is not None and self.pair_store.data_version() == self.pairs_version:
+                return
+        except Exception as e:
+            print(f"Error checking message-image pairs: {e}")
+        self.load_pairs()
+
+    def load_settings(self, record=None):
+        if record is None:
+            record = read_json(SETTINGS_PATH, {})
+        default_settings = {"notification_interval": 5, "prefetch_size": 3, "quiet_hours_start": "",
+                            "quiet_hours_end": "", "idle_threshold_minutes": 10, "max_backoff_factor": 8}
+        self.settings = default_settings
+        self.settings.update(record)
+        self.settings_version = record.get("version")
+        self.policy.configure(self.settings)
+        self.prefetch_size = max(1, int(self.settings["prefetch_size"]))
+
+    def load_pairs(self):
+        self.prefetch.clear()
+        QTimer.singleShot(0, self.fill_prefetch)
+        self.pair_count = 0
+        self.rotation = Rotation(0)
+        try:
+            if self.pair_store is None:
+                self.pair_store = PairStore(PAIRS_DB_PATH)
+                self.pair_store.migrate_legacy(PAIRS_PATH, os.path.join(ADDON_PATH, "msg.txt"), IMAGES_DIR)
+            self.pairs_version = self.pair_store.data_version()
+            # Only the row count is read up front; rows are fetched by slot as they are shown.
+            self.pair_count = self.pair_store.count()
+            weights = self.pair_store.weights() if self.pair_store.has_custom_weights() else None
+            self.rotation = Rotation(self.pair_count, weights, read_json(ROTATION_PATH, {}))
+        except Exception as e:
+            print(f"Error loading message-image pairs: {e}")
+
+    def setup_tray(self):
+        self.tray_icon = QSystemTrayIcon(QIcon(self.star_pixmap), self)
+        self.tray_icon.setContextMenu(self.create_tray_menu())
+        if not self.bench:
+            self.tray_icon.show()
+        self.tray_icon.activated.connect(self.tray_icon_clicked)
+
+    def create_tray_menu(self):
+        menu = QMenu()
+        close_action = menu.addAction("Close")
+        close_action.triggered.connect(self.close_notification)
+        return menu
+
+    def tray_icon_clicked(self, reason):
+        if reason == QSystemTrayIcon.ActivationReason.Trigger:
+            self.policy.engaged()
+            self.show_notification()
+
+    def update_content(self):
+        # Load card count from card_count.json
+        card_info = self.card_info
+        if card_info is None:
+            card_info = read_json(CARD_COUNT_PATH, {})
+        due_cards = card_info.get("count", 0)
+        self.shown_due_count = due_cards
+        selected_deck = card_info.get("deck", "all")
+
+        # Only show notification if there are due cards
+        if due_cards == 0:
+            self.hide()
+            return False
+
+        entry = self.next_prefetched() if self.pair_count else None
+        if entry is None:
+            self.text_label.setText("No content available")
+            self.image_label.clear()
+            return True
+            
+        pair = entry["pair"]
+        
+        message = pair.get("message", "")
+        if not message:
+            message = "(No message)"
+            
+        # Add card count to the message
+        deck_text = f" no deck {selected_deck}" if selected_deck != "all" else ""
+        card_status = f"Faltam {due_cards} cards{deck_text}!"
+        full_message = f"{message}<br><br><b>{card_status}</b>"
+        if "new" in card_info:
+            full_message += (f"<br>Novos: {card_info.get('new', 0)} · "
+                             f"Aprendendo: {card_info.get('learn', 0)} · "
+                             f"Revisão: {card_info.get('review', 0)}")
+        
+        self.text_label.setText(full_message)
+        
+        image_path = self.image_resolver.resolve(pair.get("image_path", ""))
+        self.current_image_path = image_path
+        self.show_prefetched = entry["pixmap"] is not None
+        if self.show_prefetched and not entry["pixmap"].isNull():
+            self.image_label.setPixmap(entry["pixmap"])
+        else:
+            self.image_label.clear()
+            if image_path and not self.show_prefetched:
+                self.thumbnails.request(image_path, 100, lambda pixmap: self.set_image(image_path, pixmap))
+        return True
+
+    def next_prefetched(self):
+        if not self.prefetch:
+            self.fill_prefetch()
+        if not self.prefetch:
+            return None
+        entry = self.prefetch.popleft()
+        try:
+            # Record the position of what is actually shown, not of what was prefetched ahead.
+            write_json(ROTATION_PATH, entry["rotation"])
+        except OSError as e:
+            print(f"Error saving rotation state: {e}")
+        # Top the queue back up once the popup is on screen.
+        QTimer.singleShot(0, self.fill_prefetch)
+        return entry
+
+    def fill_prefetch(self):
+        while self.pair_count and len(self.prefetch) < self.prefetch_size:
+            pair = self.fetch_pair(self.rotation.next())
+            if pair is None:
+                break
+            entry = {"pair": pair, "pixmap": None, "rotation": self.rotation.state()}
+            self.prefetch.append(entry)
+            image_path = self.image_resolver.resolve(entry["pair"].get("image_path", ""))
+            if image_path:
+                self.thumbnails.request(image_path, 100, lambda pixmap, e=entry: e.update(pixmap=pixmap))
+            else:
+                entry["pixmap"] = QPixmap()
+
+    def fetch_pair(self, slot):
+        try:
+            row = self.pair_store.get_by_slot(slot)
+        except Exception as e:
+            print(f"Error reading message-image pair: {e}")
+            return None
+        if row is None:
+            # The add-on shrank the table after the count was read; pick up the new count.
+            self.reload_pairs()
+            return None
+        _, message, image_path, _ = row
+        return {"message": message, "image_path": image_path}
+
+    def set_image(self, image_path, pixmap):
+        if image_path == self.current_image_path and not pixmap.isNull():
+            self.image_label.setPixmap(pixmap)
+
+    def position_near_clock(self):
+        screen_rect = QApplication.primaryScreen().availableGeometry()
+        self.move(screen_rect.width() - self.width() - 10, screen_rect.height() - self.height() - 40)
+
+    def show_context_menu(self, position):
+        menu = QMenu()
+        close_action = menu.addAction("Close Notification")
+        close_action.triggered.connect(self.close_notification)
+        menu.exec(self.mapToGlobal(position))
+
+    def close_notification(self):
+        try:
+            write_json(CONFIG_PATH, {"active": False})
+        except Exception as e:
+            print(f"Error saving state: {e}")
+        self.tray_icon.hide()
+        self.close()
+        QApplication.quit()
+
+    def check_status(self):
+        config = read_json(CONFIG_PATH)
+        if config is None or config.get("version") == self.state_version:
+            return
+        self.state_version = config.get("version")
+        self.apply_state(config)
+
+    def apply_state(self, config):
+        if not config.get("active", True):
+            self.tray_icon.hide()
+            self.close()
+            QApplication.quit()
+            return
+
+        if config.get("in_review", False):
+            self.policy.engaged()
+            self.cycle_timer.stop()
+            self.stop_popup()
+        elif not self.cycle_timer.isActive():
+            self.schedule_next_popup(self.policy.next_delay())
+
+def main(argv):
+    bench = "--bench" in argv
+    app = QApplication(argv)
+    if not bench:
+        # Only one notifier per add-on folder; later launches leave the running daemon in charge.
+        lock = QLockFile(LOCK_PATH)
+        lock.setStaleLockTime(0)
+        if not lock.tryLock(0):
+            print("Notifier already running")
+            return 0
+    window = StarNotification(bench=bench)
+    return app.exec()
+
@@ -0,0 +1,16 @@
+import os
+import sys
+
+# Entry point for the background notifier. It stays tiny because the script passed to the
+# interpreter is never cached as bytecode; the real work lives in star_notification, whose
+# .pyc is reused between launches, and PyQt6 is only imported once we know we need it.
+
+def main():
+    addon_path = os.path.dirname(os.path.abspath(__file__))
+    if addon_path not in sys.path:
+        sys.path.insert(0, addon_path)
+    from star_notification import main as run_notifier
+    return run_notifier(sys.argv)
+
+if __name__ == "__main__":
+    sys.exit(main())
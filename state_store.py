@@ -0,0 +1,49 @@
+import os
+import json
+import time
+import hashlib
+
+# Shared JSON state files are read by one process while the other writes them. Writes go
+# through a temp file and os.replace so readers only ever see a complete record, and every
+# record carries a version so readers can tell a new state from one they already applied.
+
+_snapshots = {}
+
+# The add-on and the notifier both import this module, so they always agree on the socket name.
+# It is derived from the add-on folder so separate installs never reach each other's notifier.
+IPC_SERVER_NAME = "anki-notifica-" + hashlib.md5(os.path.dirname(os.path.abspath(__file__)).encode("utf-8")).hexdigest()[:10]
+
+def write_json(path, data, indent=None):
+    record = dict(data)
+    record["version"] = time.time_ns()
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(record, f, indent=indent)
+    for attempt in range(5):
+        try:
+            os.replace(temp_path, path)
+            break
+        except PermissionError:
+            # Windows refuses to replace a file another process has open; it is only held briefly.
+            if attempt == 4:
+                os.remove(temp_path)
+                raise
+            time.sleep(0.01)
+    _snapshots[path] = record
+    return record
+
+def read_json(path, default=None, retries=3):
+    for attempt in range(retries):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                record = json.load(f)
+            if isinstance(record, dict):
+                _snapshots[path] = record
+                return record
+            break
+        except FileNotFoundError:
+            break
+        except (OSError, ValueError):
+            # A file written by an older, non-atomic writer may be caught mid-write.
+            time.sleep(0.01)
+    return _snapshots.get(path, default)
@@ -0,0 +1,122 @@
+import os
+import hashlib
+from collections import OrderedDict
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, Qt, pyqtSignal
+from PyQt6.QtGui import QImage, QImageReader, QPixmap
+
+THUMBNAIL_SIZES = (100, 400)
+
+def thumbnail_path(cache_dir, image_path, size):
+    try:
+        stat = os.stat(image_path)
+    except OSError:
+        return None
+    key = f"{os.path.abspath(image_path)}|{stat.st_mtime_ns}|{stat.st_size}"
+    return os.path.join(cache_dir, f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}_{size}.png")
+
+def save_image_atomic(image, path):
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    if image.save(temp_path, "PNG"):
+        os.replace(temp_path, path)
+    elif os.path.exists(temp_path):
+        os.remove(temp_path)
+
+def load_thumbnail(cache_dir, image_path, size):
+    # Safe to call from worker threads: only QImage/QImageReader are used here.
+    cache_path = thumbnail_path(cache_dir, image_path, size)
+    if cache_path is None:
+        return QImage()
+    if os.path.exists(cache_path):
+        image = QImage(cache_path)
+        if not image.isNull():
+            return image
+
+    # Decode once at the largest variant and derive the smaller ones from it, so the
+    # full-resolution original is only read a single time.
+    largest = max(THUMBNAIL_SIZES + (size,))
+    reader = QImageReader(image_path)
+    reader.setAutoTransform(True)
+    original_size = reader.size()
+    # Only ever scale down; an original smaller than the variant is kept at its own size.
+    if original_size.isValid() and max(original_size.width(), original_size.height()) > largest:
+        reader.setScaledSize(original_size.scaled(largest, largest, Qt.AspectRatioMode.KeepAspectRatio))
+    decoded = reader.read()
+    if decoded.isNull():
+        return decoded
+
+    os.makedirs(cache_dir, exist_ok=True)
+    result = QImage()
+    for variant in sorted(set(THUMBNAIL_SIZES + (size,))):
+        image = decoded if max(decoded.width(), decoded.height()) <= variant else decoded.scaled(
+            variant, variant, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+        try:
+            save_image_atomic(image, thumbnail_path(cache_dir, image_path, variant))
+        except OSError as e:
+            print(f"Error saving thumbnail for {image_path}: {e}")
+        if variant == size:
+            result = image
+    return result
+
+class _ThumbnailSignals(QObject):
+    finished = pyqtSignal(str, int, QImage)
+
+class _ThumbnailTask(QRunnable):
+    def __init__(self, cache_dir, image_path, size, signals):
+        super().__init__()
+        self.cache_dir = cache_dir
+        self.image_path = image_path
+        self.size = size
+        self.signals = signals
+
+    def run(self):
+        try:
+            image = load_thumbnail(self.cache_dir, self.image_path, self.size)
+        except Exception as e:
+            print(f"Error creating thumbnail for {self.image_path}: {e}")
+            image = QImage()
+        self.signals.finished.emit(self.image_path, self.size, image)
+
+class ThumbnailService:
+    def __init__(self, cache_dir, max_entries=512):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.pixmaps = OrderedDict()
+        self.pending = {}
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(2)
+        self.signals = _ThumbnailSignals()
+        self.signals.finished.connect(self._on_finished)
+
+    def cached(self, image_path, size):
+        pixmap = self.pixmaps.get((image_path, size))
+        if pixmap is not None:
+            self.pixmaps.move_to_end((image_path, size))
+        return pixmap
+
+    def request(self, image_path, size, callback):
+        pixmap = self.cached(image_path, size)
+        if pixmap is not None:
+            callback(pixmap)
+            return
+        key = (image_path, size)
+        if key in self.pending:
+            self.pending[key].append(callback)
+            return
+        self.pending[key] = [callback]
+        self.pool.start(_ThumbnailTask(self.cache_dir, image_path, size, self.signals))
+
+    def _store(self, image_path, size, image):
+        pixmap = QPixmap.fromImage(image) if not image.isNull() else QPixmap()
+        self.pixmaps[(image_path, size)] = pixmap
+        if len(self.pixmaps) > self.max_entries:
+            self.pixmaps.popitem(last=False)
+        return pixmap
+
+    def _on_finished(self, image_path, size, image):
+        pixmap = self._store(image_path, size, image)
+        for callback in self.pending.pop((image_path, size), []):
+            try:
+                callback(pixmap)
+            except RuntimeError:
+                # The label waiting for this thumbnail was deleted in the meantime.
+                pass